@@ -12,11 +12,17 @@ Date: 2025
 import pandas as pd
 import json
 import re
+import unicodedata
 from pathlib import Path
 from time import sleep
 from difflib import SequenceMatcher
 from datetime import datetime
-from pyalex import Authors, Institutions
+from openalex_http import get_session
+from publish_datasets import publish_dataset, report_published
+from roster_diff import append_audit_log, combine_diffs, delta_mask, diff_rosters, is_empty, merge_delta, save_snapshot, stage_delta
+from review_session import PREFETCH, ReviewSession, filter_review_items, log_decision
+from roster_schema import load_roster
+from score_cache import ScoreCache, scorer_version, payload_fingerprint
 
 # =============================================================================
 # CONFIGURATION
@@ -26,6 +32,18 @@ FACULTY_FILE = Path("../static/data/academic-research-groups.csv")
 UVM_INSTITUTION_ID = 'i111236770'  # University of Vermont OpenAlex ID
 OUTPUT_DIR = Path("../static/data/")
 CACHE_FILE = Path("./faculty_openalex_cache.json")
+SCORE_CACHE_FILE = Path("./faculty_score_cache.json")
+REVIEW_LOG_FILE = Path("./faculty_review_log.jsonl")  # labels for tune_match_thresholds.py
+DELTA_ONLY = True  # only rematch rows added or changed since the last run (see roster_diff.py)
+MATCHING_STAGE = "openalex_matching"
+
+# Match scoring (tune against past review decisions with tune_match_thresholds.py)
+NAME_WEIGHT = 60                   # points for a perfect name match
+AFFILIATION_POINTS = (30, 20, 10)  # last UVM affiliation within 2 years / 5 years / older
+NO_PUBLICATIONS_PENALTY = -10
+HIGH_CONFIDENCE = 70               # best score above this is 'high'
+MEDIUM_CONFIDENCE = 50             # ... above this 'medium', otherwise 'low'
+COMPETITOR_MARGIN = 10             # runner-up within this many points needs review
 
 # =============================================================================
 # STEP 1: LOAD DATA AND SEARCH OPENALEX
@@ -34,47 +52,105 @@ CACHE_FILE = Path("./faculty_openalex_cache.json")
 def load_and_prepare_faculty_data():
     """Load faculty data and prepare names for matching."""
     print("Loading faculty data...")
-    d = pd.read_csv(FACULTY_FILE)
+    d = add_search_names(load_roster(FACULTY_FILE))
+    print(f"Loaded {len(d)} faculty members")
+    return d
+
+def add_search_names(d):
+    """Add the search_name ("First Last") and search_key columns used for matching."""
+    d = d.copy()
     
     # Convert "Last, First" format to "First Last"
     d['search_name'] = d.payroll_name.str.split(",").map(
         lambda x: f"{x[1].strip()} {x[0].strip()}" if len(x) == 2 else x[0]
     )
-    
-    print(f"Loaded {len(d)} faculty members")
+    # Rows whose names only differ in spacing, case, accents or punctuation
+    # (e.g. "Bates,Jason" vs "Bates, Jason") share one search key
+    d['search_key'] = d['search_name'].map(canonical_name_key)
     return d
 
-def search_openalex_for_faculty(faculty_df, use_cache=True):
-    """Search OpenAlex for each faculty member."""
+def canonical_name_key(name):
+    """
+    Canonical form of a search name used to group equivalent names
+    
+    Only folds spacing, punctuation, case and accents. Unlike normalize_name
+    it keeps generational suffixes and titles, so "Smith, John" and
+    "Smith, John Jr" stay two searches for two people.
+    """
+    folded = unicodedata.normalize('NFKD', name)
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    folded = re.sub(r'[^\w\s]', '', folded)
+    return ' '.join(folded.split()).lower()
+
+def dedupe_search_names(faculty_df):
+    """
+    Collapse rows with equivalent names into one search per group
+    
+    Returns:
+        dict of search_key -> representative search_name (first row seen)
+    """
+    
+    groups = faculty_df.drop_duplicates('search_key').set_index('search_key')['search_name']
+    saved = len(faculty_df) - len(groups)
+    print(f"{len(faculty_df)} faculty rows -> {len(groups)} distinct names "
+          f"({saved} redundant searches saved)")
+    return groups.to_dict()
+
+def search_openalex_for_faculty(search_groups, use_cache=True):
+    """
+    Search OpenAlex once per distinct faculty name
+    
+    Every name is requested on each run so that changes in OpenAlex show up.
+    With use_cache, requests go out as conditional requests against the HTTP
+    cache (unchanged results come back as 304s) and CACHE_FILE is only an
+    offline fallback for names whose request fails.
     
-    # Try to load from cache first
+    Args:
+        search_groups: dict of search_key -> search_name from dedupe_search_names
+        use_cache: revalidate earlier responses and fall back to CACHE_FILE
+    
+    Returns:
+        dict of search_key -> list of candidate authors (None on error)
+    """
+    
+    cached = {}
     if use_cache and CACHE_FILE.exists():
-        print(f"Loading cached results from {CACHE_FILE}")
         with open(CACHE_FILE, 'r') as f:
-            return json.load(f)
+            # Older caches were keyed by search_name; canonicalizing is idempotent
+            cached = {canonical_name_key(name): authors for name, authors in json.load(f).items()}
     
-    print("Searching OpenAlex API for faculty matches...")
+    print(f"Searching OpenAlex API for {len(search_groups)} faculty names...")
+    session = get_session()
     faculty_raw_oa = {}
+    fallbacks = 0
     
-    for i, faculty_name in enumerate(faculty_df.search_name):
-        print(f"Searching {i+1}/{len(faculty_df)}: {faculty_name}")
+    for i, (search_key, faculty_name) in enumerate(search_groups.items()):
+        print(f"Searching {i+1}/{len(search_groups)}: {faculty_name}")
         
         try:
-            authors = Authors().search(faculty_name).filter(
-                affiliations={"institution": {"id": UVM_INSTITUTION_ID}}
-            ).get()
-            faculty_raw_oa[faculty_name] = authors
+            authors = session.search_authors(faculty_name, institution_id=UVM_INSTITUTION_ID,
+                                             revalidate=use_cache)
+            faculty_raw_oa[search_key] = authors
             
         except Exception as e:
-            print(f"Error for {faculty_name}: {e}")
-            faculty_raw_oa[faculty_name] = None
+            if cached.get(search_key) is not None:
+                print(f"Error for {faculty_name}: {e} (using results from {CACHE_FILE})")
+                faculty_raw_oa[search_key] = cached[search_key]
+                fallbacks += 1
+            else:
+                print(f"Error for {faculty_name}: {e}")
+                faculty_raw_oa[search_key] = None
         
         sleep(0.1)  # Be nice to the API
     
-    # Cache the results
+    session.report()
+    if fallbacks:
+        print(f"⚠️  {fallbacks} names fell back to cached results")
+    
+    # Keep the offline copy, including names not searched this run
     print(f"Saving results to cache: {CACHE_FILE}")
     with open(CACHE_FILE, 'w') as f:
-        json.dump(faculty_raw_oa, f, indent=2)
+        json.dump({**cached, **faculty_raw_oa}, f, indent=2)
     
     return faculty_raw_oa
 
@@ -130,62 +206,104 @@ def calculate_name_similarity(payroll_name, openalex_name):
     combined_score = (first_sim * 0.4 + last_sim * 0.4 + full_sim * 0.2 + middle_bonus)
     return min(combined_score, 1.0)  # Cap at 1.0
 
-def score_author_match(faculty_name, author_data):
-    """Score how well an OpenAlex author matches a faculty member."""
-    score = 0
-    flags = []
-    
-    # 1. Name similarity (0-60 points)
+def match_features(faculty_name, author_data):
+    """
+    Inputs to the match score for one candidate
+
+    Returns:
+        (name similarity, years since the last UVM affiliation or None, works count)
+    """
     author_name = author_data.get('display_name', '')
     name_sim = calculate_name_similarity(faculty_name, author_name)
-    score += name_sim * 60
     
-    if name_sim < 0.6:
-        flags.append(f'low_name_similarity_{name_sim:.2f}')
-    
-    # 2. Affiliation recency (0-30 points)
-    current_year = datetime.now().year
     uvm_affiliation_years = []
-    
     for affiliation in author_data.get('affiliations', []):
         if affiliation.get('institution', {}).get('id') == f"https://openalex.org/{UVM_INSTITUTION_ID}":
             years = affiliation.get('years', [])
             uvm_affiliation_years.extend(years)
     
-    if uvm_affiliation_years:
-        most_recent = max(uvm_affiliation_years)
-        if current_year - most_recent <= 2:
-            score += 30  # Current/recent affiliation
-        elif current_year - most_recent <= 5:
-            score += 20  # Recent affiliation
-        else:
-            score += 10  # Older affiliation
+    years_since_uvm = datetime.now().year - max(uvm_affiliation_years) if uvm_affiliation_years else None
+    return name_sim, years_since_uvm, author_data.get('works_count', 0)
+
+def affiliation_tier(years_since_uvm):
+    """Index into AFFILIATION_POINTS, or None without a UVM affiliation."""
+    if years_since_uvm is None:
+        return None
+    return 0 if years_since_uvm <= 2 else 1 if years_since_uvm <= 5 else 2
+
+def compute_author_score(faculty_name, author_data):
+    """Score how well an OpenAlex author matches a faculty member."""
+    score = 0
+    flags = []
+    name_sim, years_since_uvm, works_count = match_features(faculty_name, author_data)
+    
+    # 1. Name similarity (0-NAME_WEIGHT points)
+    score += name_sim * NAME_WEIGHT
+    
+    if name_sim < 0.6:
+        flags.append(f'low_name_similarity_{name_sim:.2f}')
+    
+    # 2. Affiliation recency
+    tier = affiliation_tier(years_since_uvm)
+    if tier is not None:
+        score += AFFILIATION_POINTS[tier]
+        if tier == 2:
             flags.append('old_affiliation')
     
     # 3. Publication activity
-    works_count = author_data.get('works_count', 0)
     if works_count == 0:
         flags.append('no_publications')
-        score -= 10
+        score += NO_PUBLICATIONS_PENALTY
     elif works_count < 5:
         flags.append('few_publications')
     
     return score, flags
 
-def process_matches(faculty_name, authors_list):
+# Anything that changes a score must feed into this hash, so that cached
+# scores from an older scorer are thrown away rather than reused
+SCORER_VERSION = scorer_version(
+    normalize_name, extract_name_parts, calculate_name_similarity,
+    match_features, affiliation_tier, compute_author_score,
+    extra={
+        'institution': UVM_INSTITUTION_ID,
+        'year': datetime.now().year,
+        'weights': [NAME_WEIGHT, list(AFFILIATION_POINTS), NO_PUBLICATIONS_PENALTY],
+    }
+)
+
+def score_author_match(faculty_name, author_data, cache=None):
+    """Score a candidate, reusing the cached score when the pair is unchanged."""
+    if cache is None:
+        return compute_author_score(faculty_name, author_data)
+    
+    key = ScoreCache.make_key(
+        normalize_name(faculty_name), author_data.get('id'), payload_fingerprint(author_data)
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    score, flags = compute_author_score(faculty_name, author_data)
+    cache.put(key, score, flags)
+    return score, flags
+
+def confidence_level(score):
+    return 'high' if score > HIGH_CONFIDENCE else 'medium' if score > MEDIUM_CONFIDENCE else 'low'
+
+def process_matches(faculty_name, authors_list, cache=None):
     """Process all potential matches for a faculty member."""
     if not authors_list:
         return None, 'no_matches', []
     
     if len(authors_list) == 1:
-        score, flags = score_author_match(faculty_name, authors_list[0])
-        confidence = 'high' if score > 70 else 'medium' if score > 50 else 'low'
+        score, flags = score_author_match(faculty_name, authors_list[0], cache)
+        confidence = confidence_level(score)
         return authors_list[0], confidence, flags
     
     # Multiple matches - score them all
     scored_matches = []
     for author in authors_list:
-        score, flags = score_author_match(faculty_name, author)
+        score, flags = score_author_match(faculty_name, author, cache)
         scored_matches.append((author, score, flags))
     
     # Sort by score (best first)
@@ -193,80 +311,122 @@ def process_matches(faculty_name, authors_list):
     best_match, best_score, best_flags = scored_matches[0]
     
     # Flag if top two scores are close
-    if len(scored_matches) > 1 and scored_matches[0][1] - scored_matches[1][1] < 10:
+    if len(scored_matches) > 1 and scored_matches[0][1] - scored_matches[1][1] < COMPETITOR_MARGIN:
         best_flags.append('close_competitors')
     
-    confidence = 'high' if best_score > 70 else 'medium' if best_score > 50 else 'low'
+    confidence = confidence_level(best_score)
     return best_match, confidence, best_flags
 
 # =============================================================================
 # STEP 3: INTERACTIVE REVIEW
 # =============================================================================
 
-def interactive_review_uncertain_matches(matches_df, raw_search_results):
-    """Manually review uncertain matches."""
-    review_needed = matches_df[matches_df['needs_review'] == True].copy()
+def build_match_context(row, raw_search_results):
+    """Candidate list and summary lines shown when reviewing one match."""
+    candidates = raw_search_results.get(row['search_key']) or []
+    lines = []
+    
+    if len(candidates) > 1:
+        lines.append(f"\nFound {len(candidates)} candidates:")
+        for i, candidate in enumerate(candidates):
+            marker = "★" if candidate['id'] == row['openalex_id'] else " "
+            lines.append(f"  {marker} {i+1}. {candidate.get('display_name', 'N/A')}")
+            lines.append(f"     ID: {candidate['id']}")
+            lines.append(f"     Works: {candidate.get('works_count', 0)}")
+            
+            # Show recent affiliations
+            affiliations = candidate.get('affiliations', [])
+            if affiliations:
+                recent_affs = [aff for aff in affiliations 
+                             if aff.get('years') and max(aff['years']) >= 2020]
+                if recent_affs:
+                    inst_names = [aff['institution']['display_name'] for aff in recent_affs[:2]]
+                    lines.append(f"     Recent affiliations: {inst_names}")
+            lines.append("")
+        
+        lines.append(f"★ = Current top pick: {row['openalex_name']}")
+    else:
+        lines.append(f"OpenAlex name: {row['openalex_name']}")
+        lines.append(f"OpenAlex ID: {row['openalex_id']}")
+    
+    return {'candidates': candidates, 'lines': lines}
+
+def interactive_review_uncertain_matches(matches_df, raw_search_results, confidence_levels=None,
+                                         flags=None, prefetch=PREFETCH, review_log=REVIEW_LOG_FILE):
+    """
+    Manually review uncertain matches
+    
+    Args:
+        confidence_levels: only review these confidence levels (e.g. ['low'])
+        flags: only review matches carrying one of these flags
+            (e.g. ['close_competitors'])
+        prefetch: number of upcoming matches prepared in the background
+        review_log: JSON-lines file each decision is appended to (None = off)
+    """
+    
+    review_needed = matches_df[matches_df['needs_review'] == True]
+    review_needed = filter_review_items(review_needed, 'confidence', confidence_levels)
+    if flags is not None:
+        review_needed = review_needed[review_needed['flags'].map(lambda f: any(flag in f for flag in flags))]
     approved = {}
     
     print(f"\nReviewing {len(review_needed)} uncertain matches...")
     
-    for idx, row in review_needed.iterrows():
-        faculty_name = row['faculty_name']
-        original_results = raw_search_results.get(faculty_name, [])
-        
-        print(f"\n--- Match {idx+1}/{len(review_needed)} ---")
-        print(f"Faculty name: {faculty_name}")
-        
-        if original_results and len(original_results) > 1:
-            print(f"\nFound {len(original_results)} candidates:")
-            for i, candidate in enumerate(original_results):
-                marker = "★" if candidate['id'] == row['openalex_id'] else " "
-                print(f"  {marker} {i+1}. {candidate.get('display_name', 'N/A')}")
-                print(f"     ID: {candidate['id']}")
-                print(f"     Works: {candidate.get('works_count', 0)}")
+    rows = [row for _, row in review_needed.iterrows()]
+    session = ReviewSession(rows, lambda row: build_match_context(row, raw_search_results), prefetch)
+    
+    with session:
+        while not session.done:
+            position, row, context = session.current()
+            search_key = row['search_key']
+            original_results = context['candidates']
+            
+            print(f"\n--- Match {position+1}/{len(session)} ---")
+            print(f"Faculty name: {row['faculty_name']}")
+            print("\n".join(context['lines']))
+            print(f"Confidence: {row['confidence']}")
+            print(f"Flags: {row['flags']}")
+            
+            # Get user choice
+            while True:
+                if len(original_results) > 1:
+                    choice = input("Choice: (y)es/(n)o/(1-9) pick number/(s)kip/(g)oto N/(q)uit: ").lower().strip()
+                    valid_nums = [str(i) for i in range(1, len(original_results) + 1)]
+                    if choice in ['y', 'n', 's', 'q'] + valid_nums:
+                        break
+                else:
+                    choice = input("Choice: (y)es/(n)o/(s)kip/(g)oto N/(q)uit: ").lower().strip()
+                    if choice in ['y', 'n', 's', 'q']:
+                        break
                 
-                # Show recent affiliations
-                affiliations = candidate.get('affiliations', [])
-                if affiliations:
-                    recent_affs = [aff for aff in affiliations 
-                                 if aff.get('years') and max(aff['years']) >= 2020]
-                    if recent_affs:
-                        inst_names = [aff['institution']['display_name'] for aff in recent_affs[:2]]
-                        print(f"     Recent affiliations: {inst_names}")
-                print()
+                if choice.startswith('g'):
+                    target = choice[1:].strip()
+                    if target.isdigit() and session.goto(int(target) - 1):
+                        break
+                    print(f"Enter g followed by a match number (1-{len(session)})")
             
-            print(f"★ = Current top pick: {row['openalex_name']}")
-        else:
-            print(f"OpenAlex name: {row['openalex_name']}")
-            print(f"OpenAlex ID: {row['openalex_id']}")
-        
-        print(f"Confidence: {row['confidence']}")
-        print(f"Flags: {row['flags']}")
-        
-        # Get user choice
-        while True:
-            if len(original_results) > 1:
-                choice = input("Choice: (y)es/(n)o/(1-9) pick number/(s)kip/(q)uit: ").lower()
-                valid_nums = [str(i) for i in range(1, len(original_results) + 1)]
-                if choice in ['y', 'n', 's', 'q'] + valid_nums:
-                    break
-            else:
-                choice = input("Choice: (y)es/(n)o/(s)kip/(q)uit: ").lower()
-                if choice in ['y', 'n', 's', 'q']:
-                    break
-        
-        # Process choice
-        if choice == 'q':
-            break
-        elif choice == 'y':
-            approved[faculty_name] = row['openalex_id']
-        elif choice == 'n':
-            approved[faculty_name] = None
-        elif choice.isdigit():
-            selected_idx = int(choice) - 1
-            if 0 <= selected_idx < len(original_results):
-                approved[faculty_name] = original_results[selected_idx]['id']
-        # 's' = skip for now
+            # Process choice
+            if choice == 'q':
+                break
+            elif choice.startswith('g'):
+                continue
+            elif choice == 'y':
+                approved[search_key] = row['openalex_id']
+            elif choice == 'n':
+                approved[search_key] = None
+            elif choice.isdigit():
+                selected_idx = int(choice) - 1
+                if 0 <= selected_idx < len(original_results):
+                    approved[search_key] = original_results[selected_idx]['id']
+            
+            if review_log and choice != 's':
+                log_decision(
+                    review_log, search_key=search_key, faculty_name=row['faculty_name'],
+                    proposed=row['openalex_id'], chosen=approved[search_key],
+                    confidence=row['confidence'], flags=row['flags'],
+                )
+            # 's' = skip for now, nothing logged
+            session.advance()
     
     return approved
 
@@ -319,6 +479,14 @@ def resolve_id_conflicts(df_with_ids):
     
     return approved
 
+def describe_openalex_author(oa_id):
+    """Print the OpenAlex record behind a manually entered ID as a sanity check."""
+    try:
+        author = get_session().get_author(oa_id)
+        print(f"   = {author.get('display_name')} ({author.get('works_count', 0)} works)")
+    except Exception as e:
+        print(f"   Could not look up {oa_id}: {e}")
+
 def manual_openalex_lookup(df_final):
     """Manual lookup for remaining unmatched faculty."""
     missing_oa = df_final[df_final['oa_uid'].isna()].copy()
@@ -358,12 +526,14 @@ def manual_openalex_lookup(df_final):
             elif user_input.startswith('A') and len(user_input) == 11:
                 manual_matches[faculty_name] = user_input
                 print(f"Added {faculty_name} -> {user_input}")
+                describe_openalex_author(user_input)
                 break
             elif user_input.startswith('https://openalex.org/'):
                 oa_id = user_input.split('/')[-1]
                 if oa_id.startswith('A') and len(oa_id) == 11:
                     manual_matches[faculty_name] = oa_id
                     print(f"Added {faculty_name} -> {oa_id}")
+                    describe_openalex_author(oa_id)
                     break
                 else:
                     print("Invalid ID format")
@@ -376,25 +546,24 @@ def manual_openalex_lookup(df_final):
 # MAIN WORKFLOW
 # =============================================================================
 
-def main():
-    """Main workflow for OpenAlex ID matching."""
-    
-    print("🔍 OpenAlex Faculty ID Matching Script")
-    print("=" * 50)
+def score_search_results(search_groups, raw_search_results):
+    """
+    Best candidate, confidence and flags for every searched name
     
-    # Step 1: Load data and search OpenAlex
-    faculty_df = load_and_prepare_faculty_data()
-    raw_search_results = search_openalex_for_faculty(faculty_df, use_cache=True)
+    Returns:
+        DataFrame with one row per search_key
+    """
     
-    # Step 2: Process and score matches
-    print("\n📊 Processing matches...")
     processed_results = []
+    score_cache = ScoreCache(SCORE_CACHE_FILE, SCORER_VERSION).load()
     
-    for faculty_name, authors in raw_search_results.items():
-        best_match, confidence, flags = process_matches(faculty_name, authors)
+    for search_key, faculty_name in search_groups.items():
+        authors = raw_search_results.get(search_key)
+        best_match, confidence, flags = process_matches(faculty_name, authors, score_cache)
         
         result = {
             'faculty_name': faculty_name,
+            'search_key': search_key,
             'openalex_id': best_match['id'] if best_match else None,
             'openalex_name': best_match['display_name'] if best_match else None,
             'confidence': confidence,
@@ -403,7 +572,35 @@ def main():
         }
         processed_results.append(result)
     
-    matches_df = pd.DataFrame(processed_results)
+    score_cache.save()
+    return pd.DataFrame(processed_results, columns=['faculty_name', 'search_key', 'openalex_id', 'openalex_name',
+                                                   'confidence', 'flags', 'needs_review'])
+
+def auto_approved_matches(matches_df):
+    """High-confidence matches plus medium ones without review flags, by search_key."""
+    accepted = matches_df[
+        (matches_df['confidence'] == 'high') |
+        ((matches_df['confidence'] == 'medium') & (matches_df['needs_review'] == False))
+    ]
+    return dict(zip(accepted['search_key'], accepted['openalex_id']))
+
+def match_faculty_ids(faculty_df):
+    """
+    Search, score, review and resolve OpenAlex IDs for the given roster rows
+    
+    Returns:
+        (the rows (same index) with oa_uid filled in and temporary columns
+        dropped, index of the rows left unresolved: a match needing review or
+        an ID conflict that was skipped, or no oa_uid and no "none" answer)
+    """
+    
+    # Step 1: Search OpenAlex
+    search_groups = dedupe_search_names(faculty_df)
+    raw_search_results = search_openalex_for_faculty(search_groups, use_cache=True)
+    
+    # Step 2: Process and score matches
+    print("\n📊 Processing matches...")
+    matches_df = score_search_results(search_groups, raw_search_results)
     review_count = matches_df['needs_review'].sum()
     print(f"Found {len(matches_df)} total matches, {review_count} need manual review")
     
@@ -413,29 +610,14 @@ def main():
     else:
         approved_matches = {}
     
-    # Step 4: Combine all matches
+    # Step 4: Combine all matches (manual decisions win)
     print("\n🔗 Combining matches...")
-    final_matches = {}
-    
-    # Add high-confidence auto-approved matches
-    high_confidence = matches_df[matches_df['confidence'] == 'high']
-    for _, row in high_confidence.iterrows():
-        final_matches[row['faculty_name']] = row['openalex_id']
-    
-    # Add manually approved matches
+    final_matches = auto_approved_matches(matches_df)
     final_matches.update(approved_matches)
     
-    # Add medium confidence matches that weren't flagged
-    medium_confidence = matches_df[
-        (matches_df['confidence'] == 'medium') & 
-        (matches_df['needs_review'] == False)
-    ]
-    for _, row in medium_confidence.iterrows():
-        final_matches[row['faculty_name']] = row['openalex_id']
-    
-    # Step 5: Merge with original data
+    # Step 5: Merge with original data (fans each name's match out to all its rows)
     df_with_openalex = faculty_df.copy()
-    df_with_openalex['openalex_id'] = df_with_openalex['search_name'].map(final_matches)
+    df_with_openalex['openalex_id'] = df_with_openalex['search_key'].map(final_matches)
     
     # Clean up OpenAlex IDs (remove URL prefix)
     df_with_openalex['openalex_id'] = df_with_openalex['openalex_id'].str.replace(
@@ -443,9 +625,16 @@ def main():
     )
     
     # Step 6: Handle conflicts with existing oa_uid
+    conflict_resolutions = {}
+    skipped_conflicts = pd.Series(False, index=df_with_openalex.index)
     if 'oa_uid' in df_with_openalex.columns:
         df_with_openalex['oa_uid'] = df_with_openalex['oa_uid'].str.capitalize()
         conflict_resolutions = resolve_id_conflicts(df_with_openalex)
+        skipped_conflicts = (
+            df_with_openalex['oa_uid'].notna() & df_with_openalex['openalex_id'].notna()
+            & (df_with_openalex['oa_uid'] != df_with_openalex['openalex_id'])
+            & ~df_with_openalex['payroll_name'].isin(list(conflict_resolutions))
+        ).fillna(False)
         
         # Apply conflict resolutions
         for faculty_name, final_id in conflict_resolutions.items():
@@ -470,19 +659,55 @@ def main():
         mask = df_final['payroll_name'] == faculty_name
         df_final.loc[mask, 'oa_uid'] = oa_id
     
-    # Step 8: Clean up and save
-    print("\n💾 Saving results...")
+    # Rows to offer again next run: skipped or quit reviews, not answered "none"
+    undecided_keys = set(matches_df.loc[matches_df['needs_review'], 'search_key']) - set(approved_matches)
+    unresolved = (
+        df_final['search_key'].isin(list(undecided_keys))
+        | skipped_conflicts
+        | (df_final['oa_uid'].isna() & ~df_final['payroll_name'].isin(list(manual_matches)))
+    )
     
     # Remove temporary columns
-    temp_columns = ['search_name', 'openalex_id']
+    temp_columns = ['search_name', 'search_key', 'openalex_id']
     df_final = df_final.drop(columns=[col for col in temp_columns if col in df_final.columns])
+    return df_final, df_final.index[unresolved.to_numpy(dtype=bool)]
+
+def main():
+    """Main workflow for OpenAlex ID matching."""
     
-    # Save final dataset
-    output_csv = OUTPUT_DIR / "academic-research-groups.csv"
-    output_parquet = OUTPUT_DIR / "academic-research-groups.parquet"
+    print("🔍 OpenAlex Faculty ID Matching Script")
+    print("=" * 50)
     
-    df_final.to_csv(output_csv, index=False)
-    df_final.to_parquet(output_parquet, index=False)
+    faculty_df = load_and_prepare_faculty_data()
+    roster_df = faculty_df.drop(columns=['search_name', 'search_key'])
+    
+    # Only rows added or changed since the last run need matching
+    delta = stage_delta(roster_df, MATCHING_STAGE) if DELTA_ONLY else None
+    if delta is not None:
+        if is_empty(delta):
+            print("✅ Roster unchanged since the last run, nothing to match")
+            return roster_df
+        faculty_df = faculty_df[delta_mask(faculty_df, delta)]
+        print(f"Matching {len(faculty_df)} added or modified rows")
+    
+    if len(faculty_df):
+        df_final, unresolved = match_faculty_ids(faculty_df)
+    else:
+        df_final, unresolved = roster_df.iloc[:0], roster_df.index[:0]
+    if delta is not None:
+        df_final = merge_delta(roster_df, df_final)
+    
+    # Step 8: Save
+    print("\n💾 Saving results...")
+    
+    # Publish CSV (+ .gz/.br), tuned Parquet and any partitioned layouts;
+    # delta runs only touch the partitions of rows that changed
+    output_delta = diff_rosters(roster_df, df_final)
+    append_audit_log(output_delta, MATCHING_STAGE, 'output')
+    published = publish_dataset(df_final, "academic-research-groups", OUTPUT_DIR,
+                                delta=combine_diffs(delta, output_delta) if delta is not None else None)
+    save_snapshot(df_final, MATCHING_STAGE, unresolved=unresolved)
+    output_csv = OUTPUT_DIR / "academic-research-groups.csv"
     
     # Final statistics
     total_with_ids = df_final['oa_uid'].notna().sum()
@@ -493,6 +718,7 @@ def main():
     print(f"   With OpenAlex IDs: {total_with_ids}")
     print(f"   Match rate: {match_rate:.1f}%")
     print(f"   Saved to: {output_csv}")
+    report_published(published)
     
     return df_final
 
@@ -0,0 +1,186 @@
+"""
+Dataset Catalog Builder
+
+Scans static/data and writes catalog.json, a compact manifest with the
+schema, row count, size and sha256 of every published file, so the site can
+describe a dataset without anyone downloading it first. Precompressed CSVs
+(.csv.gz, .csv.br) are described through their codec.
+
+Parquet files are described from their footer metadata alone. CSVs get their
+schema from the first block and are row-counted while parsing a single
+column. Entries whose content hash matches the previous manifest are reused
+as-is, so a rebuild only re-reads the files that actually changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from roster_schema import DATA_DIR
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CATALOG_FILE = DATA_DIR / "catalog.json"
+CATALOG_VERSION = 1
+DATA_SUFFIXES = ('.csv', '.parquet', '.csv.gz', '.csv.br')
+CSV_CODECS = {'.gz': 'gzip', '.br': 'brotli'}
+HASH_BLOCK_SIZE = 1 << 20
+
+# =============================================================================
+# FILE DESCRIPTIONS
+# =============================================================================
+
+def file_sha256(path):
+    """Content hash of a file, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _columns(schema):
+    return [[field.name, str(field.type)] for field in schema]
+
+def describe_parquet(path):
+    """Schema and row counts from the Parquet footer; no column data is read."""
+    metadata = pq.read_metadata(path)
+    return {
+        'format': 'parquet',
+        'rows': metadata.num_rows,
+        'row_groups': metadata.num_row_groups,
+        'columns': _columns(metadata.schema.to_arrow_schema()),
+    }
+
+def describe_csv(path, compression=None):
+    """Inferred schema from the first block, rows counted over one column."""
+    def open_stream():
+        return pa.input_stream(str(path), compression=compression)
+
+    # Free-text fields such as notes may hold quoted line breaks
+    parse_options = pv.ParseOptions(newlines_in_values=True)
+    reader = pv.open_csv(open_stream(), parse_options=parse_options)
+    schema = reader.schema
+    reader.close()
+
+    rows = 0
+    if len(schema) > 0:
+        reader = pv.open_csv(open_stream(), parse_options=parse_options, convert_options=pv.ConvertOptions(
+            include_columns=[schema[0].name],
+            column_types={schema[0].name: 'string'},
+        ))
+        rows = sum(batch.num_rows for batch in reader)
+
+    description = {
+        'format': 'csv',
+        'rows': rows,
+        'columns': _columns(schema),
+    }
+    if compression:
+        description['encoding'] = compression
+    return description
+
+def describe_file(path):
+    if path.suffix == '.parquet':
+        return describe_parquet(path)
+    return describe_csv(path, compression=CSV_CODECS.get(path.suffix))
+
+# =============================================================================
+# CATALOG
+# =============================================================================
+
+def dataset_files(data_dir=DATA_DIR, catalog_path=CATALOG_FILE):
+    """Published data files below data_dir, as sorted relative paths."""
+    data_dir = Path(data_dir)
+    return sorted(
+        path.relative_to(data_dir).as_posix()
+        for path in data_dir.rglob('*')
+        if path.is_file() and path.name.endswith(DATA_SUFFIXES) and path != Path(catalog_path)
+    )
+
+def load_catalog(catalog_path=CATALOG_FILE):
+    """Previous manifest entries keyed by relative path (empty if none)."""
+    try:
+        with open(catalog_path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    if data.get('version') != CATALOG_VERSION:
+        return {}
+    return data.get('files', {})
+
+def build_catalog(data_dir=DATA_DIR, catalog_path=CATALOG_FILE):
+    """
+    Describe every data file, reusing entries whose content hash is unchanged
+
+    Returns:
+        (manifest dict, stats dict with reused/rebuilt/removed counts)
+    """
+
+    data_dir = Path(data_dir)
+    previous = load_catalog(catalog_path)
+
+    files = {}
+    stats = {'reused': 0, 'rebuilt': 0, 'removed': 0}
+
+    for name in dataset_files(data_dir, catalog_path):
+        path = data_dir / name
+        digest = file_sha256(path)
+
+        entry = previous.get(name)
+        if entry and entry.get('sha256') == digest:
+            stats['reused'] += 1
+        else:
+            entry = {
+                'dataset': name.split('/')[0].split('.')[0],
+                'bytes': path.stat().st_size,
+                'sha256': digest,
+                **describe_file(path),
+            }
+            stats['rebuilt'] += 1
+        files[name] = entry
+
+    stats['removed'] = len(set(previous) - set(files))
+    return {'version': CATALOG_VERSION, 'files': files}, stats
+
+def write_catalog(manifest, catalog_path=CATALOG_FILE):
+    """Write the manifest as compact JSON; returns False if it was unchanged."""
+    catalog_path = Path(catalog_path)
+    blob = json.dumps(manifest, sort_keys=True, separators=(',', ':'))
+
+    if catalog_path.exists() and catalog_path.read_text() == blob:
+        return False
+
+    tmp = catalog_path.with_name(catalog_path.name + '.tmp')
+    tmp.write_text(blob)
+    os.replace(tmp, catalog_path)
+    return True
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main():
+    """Rebuild static/data/catalog.json."""
+    print("🗂️  Dataset catalog")
+    print("=" * 50)
+
+    manifest, stats = build_catalog()
+    written = write_catalog(manifest)
+
+    for name, entry in manifest['files'].items():
+        print(f"   {name}: {entry['rows']} rows, {len(entry['columns'])} columns, {entry['bytes']:,} bytes")
+    print(f"\n{stats['rebuilt']} entries rebuilt, {stats['reused']} reused, {stats['removed']} removed")
+    print(f"✅ Saved {CATALOG_FILE}" if written else f"✅ {CATALOG_FILE} already up to date")
+
+    return manifest
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+DuckDB Engine for Roster and Paper Analytics
+
+Optional SQL engine for the heavy joins, filters and groupbys in the cleaning
+pipeline. Queries run directly over the Parquet/CSV files with DuckDB, which
+is multi-threaded and spills to disk, so the full papers table never has to
+be materialized in pandas. Each function returns the same DataFrame as its
+pandas counterpart in fix_first_pub_year.py.
+
+DuckDB is optional: install it with `pip install duckdb` to use this engine.
+"""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# =============================================================================
+# CONNECTION AND SOURCES
+# =============================================================================
+
+def connect(threads=None, memory_limit=None):
+    """
+    Open an in-process DuckDB connection
+
+    Args:
+        threads: worker threads (default: all cores)
+        memory_limit: e.g. '4GB'; DuckDB spills to disk beyond it
+    """
+
+    if duckdb is None:
+        raise ImportError("The DuckDB engine needs the duckdb package: pip install duckdb")
+
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    if memory_limit:
+        con.execute(f"SET memory_limit = '{memory_limit}'")
+    return con
+
+def _sql_string(value):
+    """Quote a path as a SQL string literal (views can't take parameters)."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _parquet_glob(path):
+    """A file path, or every Parquet file below a dataset directory."""
+    path = Path(path)
+    return str(path / "**" / "*.parquet") if path.is_dir() else str(path)
+
+def _register_papers(con, paper_path):
+    # filename/file_row_number reproduce the on-disk order that pandas reads,
+    # so ties in (ego_aid, pub_year) come out in the same order
+    con.execute(
+        "CREATE OR REPLACE TEMP VIEW papers AS SELECT * FROM read_parquet("
+        f"{_sql_string(_parquet_glob(paper_path))}, "
+        "filename = true, file_row_number = true, hive_partitioning = false)"
+    )
+
+def _register_roster(con, roster):
+    """Expose the roster (DataFrame, CSV or Parquet path) as the view `roster`."""
+    if isinstance(roster, pd.DataFrame):
+        con.register('roster_df', roster)
+        source = "SELECT * FROM roster_df"
+    elif Path(roster).suffix == '.parquet':
+        source = f"SELECT * FROM read_parquet({_sql_string(roster)})"
+    else:
+        source = f"SELECT * FROM read_csv_auto({_sql_string(roster)}, header = true)"
+
+    con.execute(f"CREATE OR REPLACE TEMP VIEW roster AS SELECT row_number() OVER () - 1 AS roster_row, * FROM ({source})")
+
+def _register_first_years(con):
+    # Same cutoffs as PaperIndex.filter_since: authors without a year keep
+    # every paper; a repeated oa_uid uses its last listed first_pub_year
+    con.execute("""
+        CREATE OR REPLACE TEMP VIEW first_years AS
+        SELECT oa_uid, arg_max(CAST(first_pub_year AS DOUBLE), roster_row) AS first_pub_year
+        FROM roster
+        WHERE oa_uid IS NOT NULL AND first_pub_year IS NOT NULL
+        GROUP BY oa_uid
+    """)
+
+_FILTERED_PAPERS = """
+    SELECT p.*
+    FROM papers p
+    LEFT JOIN first_years f ON p.ego_aid = f.oa_uid
+    WHERE f.first_pub_year IS NULL OR p.pub_year IS NULL OR NOT (p.pub_year < f.first_pub_year)
+"""
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def filter_papers(paper_path, roster, con=None):
+    """
+    Papers on or after each author's first_pub_year
+
+    Equivalent to filter_papers_before_first_year(...).papers: sorted by
+    (ego_aid, pub_year) with missing values last.
+    """
+
+    con = con or connect()
+    _register_papers(con, paper_path)
+    _register_roster(con, roster)
+    _register_first_years(con)
+
+    return con.execute(f"""
+        SELECT * EXCLUDE (filename, file_row_number)
+        FROM ({_FILTERED_PAPERS})
+        ORDER BY ego_aid NULLS LAST, pub_year NULLS LAST, filename, file_row_number
+    """).df()
+
+def author_pub_years(paper_path, roster, con=None):
+    """
+    Per-author publication years after the first_pub_year filter
+
+    Returns:
+        DataFrame with ego_aid, paper_count and pub_years (ascending list,
+        missing years last), one row per author
+    """
+
+    con = con or connect()
+    _register_papers(con, paper_path)
+    _register_roster(con, roster)
+    _register_first_years(con)
+
+    df = con.execute(f"""
+        SELECT
+            ego_aid,
+            count(*) AS paper_count,
+            list(CAST(pub_year AS DOUBLE) ORDER BY pub_year NULLS LAST) AS pub_years
+        FROM ({_FILTERED_PAPERS})
+        WHERE ego_aid IS NOT NULL
+        GROUP BY ego_aid
+        ORDER BY ego_aid
+    """).df()
+
+    # Lists holding NULLs arrive as masked arrays; make them plain NaN arrays
+    df['pub_years'] = [np.ma.filled(np.ma.asarray(years, dtype=np.float64), np.nan) for years in df['pub_years']]
+    return df
+
+def apply_cleaning(faculty_df, analysis_df, con=None):
+    """
+    SQL version of apply_cleaning_to_faculty_data
+
+    Joins the analysis onto the roster (one analysis row per ego_aid) and adds
+    first_pub_year_original / first_pub_year_cleaned, keeping roster order.
+    """
+
+    con = con or connect()
+    _register_roster(con, faculty_df)
+
+    analysis = analysis_df[['ego_aid', 'recommendation', 'confidence', 'final_suggested_year',
+                            'cleaning_action', 'max_gap', 'reasoning']]
+    analysis = analysis.dropna(subset=['ego_aid']).drop_duplicates('ego_aid')
+    con.register('analysis_df', analysis)
+
+    df = con.execute("""
+        SELECT
+            r.* EXCLUDE (roster_row),
+            a.*,
+            r.first_pub_year AS first_pub_year_original,
+            CASE WHEN a.cleaning_action = 'clean_to_suggested'
+                 THEN a.final_suggested_year ELSE r.first_pub_year END AS first_pub_year_cleaned
+        FROM roster r
+        LEFT JOIN analysis_df a ON r.oa_uid = a.ego_aid
+        ORDER BY r.roster_row
+    """).df()
+
+    # Hand back the roster's own dtypes rather than DuckDB's
+    return df.astype({col: faculty_df[col].dtype for col in faculty_df.columns})
+
+# =============================================================================
+# LAZY PER-AUTHOR ACCESS
+# =============================================================================
+
+class SqlPapers:
+    """
+    Per-author paper lookups answered by DuckDB over the filtered papers
+
+    Stands in for a PaperIndex in the review helpers, so reviewing never
+    loads the whole papers table into pandas. The filter runs once into a
+    temp table sorted by author (which DuckDB can spill to disk), so each
+    lookup only scans that author's rows instead of redoing the join over
+    every paper file.
+    """
+
+    def __init__(self, paper_path, roster, con=None):
+        self.con = con or connect()
+        self._lock = threading.Lock()
+        _register_papers(self.con, paper_path)
+        _register_roster(self.con, roster)
+        _register_first_years(self.con)
+        self.con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE filtered_papers AS
+            SELECT * FROM ({_FILTERED_PAPERS})
+            ORDER BY ego_aid NULLS LAST, pub_year NULLS LAST, filename, file_row_number
+        """)
+
+    def papers_for(self, ego_aid, since=None):
+        with self._lock:
+            return self.con.execute("""
+                SELECT * EXCLUDE (filename, file_row_number)
+                FROM filtered_papers
+                WHERE ego_aid = ? AND (? IS NULL OR pub_year IS NULL OR pub_year >= ?)
+                ORDER BY pub_year NULLS LAST, filename, file_row_number
+            """, [ego_aid, since, since]).df()
+
+    def years_for(self, ego_aid, since=None):
+        return self.papers_for(ego_aid, since)['pub_year'].to_numpy(dtype='float64', na_value=np.nan)
+
+    def to_parquet(self, path):
+        """Export the filtered papers, sorted like PaperIndex, without pandas."""
+        with self._lock:
+            self.con.execute(f"""
+                COPY (
+                    SELECT * EXCLUDE (filename, file_row_number)
+                    FROM filtered_papers
+                    ORDER BY ego_aid NULLS LAST, pub_year NULLS LAST, filename, file_row_number
+                ) TO {_sql_string(path)} (FORMAT parquet)
+            """)
@@ -0,0 +1,149 @@
+"""
+Roster Enrichment: Department-to-College Join
+
+The roster's college column duplicates the mapping in academic-department.csv
+and nothing keeps the two in sync. This stage streams the roster in chunks,
+joins each chunk against an indexed in-memory department table, and publishes
+the enriched roster incrementally (CSV, Parquet, precompressed copies and the
+catalog entry), so memory stays bounded by the chunk size no matter how large
+the roster is. Host departments missing from the department table are
+reported rather than guessed.
+
+Joint appointments are recorded as "Medicine; Surgery"; the first (primary)
+department decides the college.
+"""
+
+from collections import Counter
+from pathlib import Path
+
+from publish_datasets import publish_chunks, report_published
+from roster_schema import ROSTER_FILE, DEPARTMENT_FILE, load_departments, iter_roster_chunks
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CHUNK_SIZE = 50_000
+JOINT_APPOINTMENT_SEP = ';'
+
+# =============================================================================
+# DEPARTMENT INDEX
+# =============================================================================
+
+def build_department_index(dept_df):
+    """
+    Index the department table by department name
+
+    A department listed for several years maps to its college in the latest
+    year (rows without a year count as oldest).
+
+    Returns:
+        Series mapping department -> college
+    """
+
+    latest = dept_df.sort_values('year', kind='stable', na_position='first')
+    latest = latest.drop_duplicates('department', keep='last')
+
+    index = latest.set_index(latest['department'].astype('string'))['college']
+    return index.astype('string')
+
+def primary_department(host_dept):
+    """First department of a possibly joint appointment."""
+    return host_dept.astype('string').str.split(JOINT_APPOINTMENT_SEP).str[0].str.strip()
+
+# =============================================================================
+# STREAMING ENRICHMENT
+# =============================================================================
+
+def enrich_chunk(chunk, dept_index):
+    """
+    Set each row's college from its primary host department
+
+    Rows whose department is not in the index keep their existing college.
+
+    Returns:
+        (enriched chunk, Counter of unmapped host_dept values, rows changed)
+    """
+
+    primary = primary_department(chunk['host_dept'])
+    mapped = primary.map(dept_index)
+
+    old_college = chunk['college'].astype('string')
+    new_college = mapped.fillna(old_college)
+    changed = int((new_college.fillna('') != old_college.fillna('')).sum())
+
+    unmapped = Counter(chunk.loc[mapped.isna() & chunk['host_dept'].notna(), 'host_dept'].astype(str))
+
+    chunk = chunk.assign(college=new_college.astype('category'))
+    return chunk, unmapped, changed
+
+def enrich_roster(roster_path=ROSTER_FILE, output_path=None, dept_path=DEPARTMENT_FILE,
+                  chunksize=CHUNK_SIZE):
+    """
+    Stream the roster through the department join and publish it
+
+    Args:
+        roster_path: roster CSV to read
+        output_path: where to publish the enriched CSV (defaults to
+            roster_path); its Parquet and precompressed copies and the catalog
+            next to it are refreshed as well
+        dept_path: department table CSV
+        chunksize: rows held in memory at a time
+
+    Returns:
+        dict with row, change and unmapped-department counts, and the
+        published files with their sizes
+    """
+
+    roster_path = Path(roster_path)
+    output_path = Path(output_path) if output_path else roster_path
+    dept_index = build_department_index(load_departments(dept_path))
+
+    stats = {'rows': 0, 'college_changed': 0}
+    unmapped = Counter()
+
+    def enriched_chunks():
+        for chunk in iter_roster_chunks(roster_path, chunksize=chunksize):
+            chunk, chunk_unmapped, changed = enrich_chunk(chunk, dept_index)
+            stats['rows'] += len(chunk)
+            stats['college_changed'] += changed
+            unmapped.update(chunk_unmapped)
+            yield chunk
+
+    # Every file is written next to its target and swapped at the end, so
+    # the output can safely be the same file we are reading from
+    published = publish_chunks(enriched_chunks(), output_path.stem, output_path.parent)
+
+    return {
+        **stats,
+        'unmapped': dict(unmapped.most_common()),
+        'published': published,
+    }
+
+def report_enrichment(stats):
+    """Print a summary of an enrichment run."""
+    print(f"Enriched {stats['rows']} rows, {stats['college_changed']} college values updated")
+
+    if stats['unmapped']:
+        print(f"⚠️  {len(stats['unmapped'])} host_dept values not in the department table:")
+        for dept, count in stats['unmapped'].items():
+            print(f"   {dept}: {count} rows")
+    else:
+        print("✅ Every host_dept maps to a college")
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main():
+    """Enrich and republish the roster in place."""
+    print("🏛️  Roster enrichment: department -> college")
+    print("=" * 50)
+
+    stats = enrich_roster(ROSTER_FILE)
+    report_enrichment(stats)
+    report_published(stats['published'])
+    return stats
+
+if __name__ == "__main__":
+    main()
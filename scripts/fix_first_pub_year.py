@@ -1,93 +1,163 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from multiprocessing import shared_memory
 import matplotlib.pyplot as plt
 import seaborn as sns
+from roster_schema import load_roster
+from roster_diff import (append_audit_log, combine_diffs, delta_mask, diff_rosters, input_fingerprint, is_empty,
+                         merge_delta, save_snapshot, stage_delta)
+from publish_datasets import publish_dataset, report_published
+from harvest_openalex_works import load_harvested_papers
+from paper_index import PaperIndex, PartitionedPapers, as_paper_index
+from review_session import PREFETCH, ReviewSession, filter_review_items
 
-def analyze_publication_gaps(papers_df, faculty_df):
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+FACULTY_FILE = "../static/data/academic-research-groups.csv"
+# Partitioned dataset written by harvest_openalex_works.py (previously read
+# from ../../complex-stories/src/lib/stories/open-academic-analytics/data/raw/paper.parquet)
+PAPER_FILE = "./data/paper"
+GAP_WORKERS = None  # processes for the gap analysis, e.g. os.cpu_count() for large paper tables
+ENGINE = "pandas"  # or "duckdb" to run the filter, aggregation and merge as SQL over the files
+OUT_OF_CORE_PARTITIONS = None  # e.g. 64 to process papers one author-hash partition at a time
+SPILL_DIR = "./data/paper_partitions"
+DELTA_ONLY = True  # only reanalyze rows added or changed since the last run (see roster_diff.py)
+GAP_STAGE = "first_pub_year"
+PAPER_EXPORT_FILE = None  # e.g. "../../complex-stories/static/data/open-academic-analytics/paper.parquet"
+
+# =============================================================================
+# STEP 1: GAP ANALYSIS
+# =============================================================================
+
+def analyze_publication_gaps(papers, faculty_df, workers=None):
     """
     Analyze publication gaps to identify false positive early publications
     
     Args:
-        papers_df: DataFrame with all papers (your format)
+        papers: PaperIndex, or DataFrame with all papers (your format)
         faculty_df: DataFrame with faculty info including current first_pub_year
+        workers: analyze authors in this many processes (None/1 = serial);
+            the result is identical to the serial path
     
     Returns:
         DataFrame with gap analysis and cleaning recommendations
     """
     
-    results = []
+    return pd.DataFrame(gap_analysis_results(papers, faculty_df, workers))
+
+def gap_analysis_results(papers, faculty_df, workers=None):
+    """Per-faculty gap analysis result dicts, in roster order."""
+    paper_index = as_paper_index(papers)
+    records = faculty_gap_records(faculty_df)
+    
+    if workers and workers > 1:
+        return analyze_publication_gaps_parallel(paper_index, records, workers)
+    return [analyze_author_years(record, paper_index.years_for(record[0])) for record in records]
+
+def faculty_gap_records(faculty_df):
+    """
+    Compact per-row faculty inputs for the gap analysis
     
-    for _, faculty in faculty_df.iterrows():
-        ego_aid = faculty['oa_uid']
-        name = faculty['payroll_name']
-        current_first_year = faculty.get('first_pub_year')
-        
-        # Get all papers for this faculty member
-        faculty_papers = papers_df[papers_df['ego_aid'] == ego_aid].copy()
-        
-        if len(faculty_papers) == 0:
-            results.append({
-                'ego_aid': ego_aid,
-                'name': name,
-                'current_first_year': current_first_year,
-                'paper_count': 0,
-                'recommendation': 'no_papers_found',
-                'confidence': 0.0,
-                'suggested_first_year': None,
-                'max_gap': None,
-                'gap_location': None
-            })
-            continue
-        
-        # Sort papers by year
-        faculty_papers = faculty_papers.sort_values('pub_year')
-        pub_years = faculty_papers['pub_year'].dropna().astype(int)
-        
-        if len(pub_years) < 2:
-            results.append({
-                'ego_aid': ego_aid,
-                'name': name,
-                'current_first_year': current_first_year,
-                'paper_count': len(faculty_papers),
-                'recommendation': 'insufficient_data',
-                'confidence': 0.0,
-                'suggested_first_year': pub_years.iloc[0] if len(pub_years) > 0 else None,
-                'max_gap': None,
-                'gap_location': None
-            })
-            continue
-        
-        # Calculate gaps between consecutive publication years
-        gaps = []
-        for i in range(len(pub_years) - 1):
-            gap = pub_years.iloc[i+1] - pub_years.iloc[i]
-            gaps.append({
-                'start_year': pub_years.iloc[i],
-                'end_year': pub_years.iloc[i+1],
-                'gap_size': gap,
-                'gap_index': i
-            })
-        
-        max_gap = max(gaps, key=lambda x: x['gap_size']) if gaps else None
-        
-        # Analysis logic
-        analysis = analyze_faculty_timeline(pub_years, gaps, faculty)
+    Returns:
+        List of (ego_aid, name, current_first_year, faculty_info) tuples
+    """
+    
+    def column(name):
+        if name in faculty_df.columns:
+            return faculty_df[name].tolist()
+        return [None] * len(faculty_df)
+    
+    has_payroll_year = 'payroll_year' in faculty_df.columns
+    records = []
+    
+    for ego_aid, name, current_first_year, payroll_year in zip(
+        column('oa_uid'), column('payroll_name'), column('first_pub_year'), column('payroll_year')
+    ):
+        # Nullable roster columns hold pd.NA, which can't be compared directly
+        if pd.isna(ego_aid):
+            ego_aid = None
+        if pd.isna(current_first_year):
+            current_first_year = None
         
-        results.append({
+        faculty_info = {'payroll_year': payroll_year} if has_payroll_year else {}
+        records.append((ego_aid, name, current_first_year, faculty_info))
+    
+    return records
+
+def analyze_author_years(record, years):
+    """
+    Gap analysis for one faculty member
+    
+    Args:
+        record: (ego_aid, name, current_first_year, faculty_info) tuple
+        years: the author's sorted pub_year array (NaN last)
+    """
+    
+    ego_aid, name, current_first_year, faculty_info = record
+    paper_count = len(years)
+    
+    if paper_count == 0:
+        return {
             'ego_aid': ego_aid,
             'name': name,
             'current_first_year': current_first_year,
-            'paper_count': len(faculty_papers),
-            'actual_first_year': pub_years.iloc[0],
-            'actual_last_year': pub_years.iloc[-1],
-            'span_years': pub_years.iloc[-1] - pub_years.iloc[0],
-            'max_gap': max_gap['gap_size'] if max_gap else 0,
-            'gap_location': f"{max_gap['start_year']}-{max_gap['end_year']}" if max_gap else None,
-            **analysis
+            'paper_count': 0,
+            'recommendation': 'no_papers_found',
+            'confidence': 0.0,
+            'suggested_first_year': None,
+            'max_gap': None,
+            'gap_location': None
+        }
+    
+    pub_years = pd.Series(years[~np.isnan(years)]).astype(int)
+    
+    if len(pub_years) < 2:
+        return {
+            'ego_aid': ego_aid,
+            'name': name,
+            'current_first_year': current_first_year,
+            'paper_count': paper_count,
+            'recommendation': 'insufficient_data',
+            'confidence': 0.0,
+            'suggested_first_year': pub_years.iloc[0] if len(pub_years) > 0 else None,
+            'max_gap': None,
+            'gap_location': None
+        }
+    
+    # Calculate gaps between consecutive publication years
+    year_values = pub_years.to_numpy()
+    gaps = []
+    for i in range(len(year_values) - 1):
+        gap = year_values[i+1] - year_values[i]
+        gaps.append({
+            'start_year': year_values[i],
+            'end_year': year_values[i+1],
+            'gap_size': gap,
+            'gap_index': i
         })
     
-    return pd.DataFrame(results)
+    max_gap = max(gaps, key=lambda x: x['gap_size']) if gaps else None
+    
+    # Analysis logic
+    analysis = analyze_faculty_timeline(pub_years, gaps, faculty_info)
+    
+    return {
+        'ego_aid': ego_aid,
+        'name': name,
+        'current_first_year': current_first_year,
+        'paper_count': paper_count,
+        'actual_first_year': pub_years.iloc[0],
+        'actual_last_year': pub_years.iloc[-1],
+        'span_years': pub_years.iloc[-1] - pub_years.iloc[0],
+        'max_gap': max_gap['gap_size'] if max_gap else 0,
+        'gap_location': f"{max_gap['start_year']}-{max_gap['end_year']}" if max_gap else None,
+        **analysis
+    }
 
 def analyze_faculty_timeline(pub_years, gaps, faculty_info):
     """
@@ -153,6 +223,48 @@ def analyze_faculty_timeline(pub_years, gaps, faculty_info):
         'reasoning': "No suspicious gaps detected"
     }
 
+# =============================================================================
+# PARALLEL GAP ANALYSIS
+# =============================================================================
+
+# Per-worker view of the shared pub_year array, set by _attach_shared_years
+_worker_years = None
+_worker_shm = None
+
+def _attach_shared_years(shm_name, length):
+    global _worker_years, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_years = np.ndarray((length,), dtype=np.float64, buffer=_worker_shm.buf)
+
+def _analyze_gap_chunk(tasks):
+    return [analyze_author_years(record, _worker_years[start:end]) for record, (start, end) in tasks]
+
+def analyze_publication_gaps_parallel(paper_index, records, workers):
+    """
+    Run analyze_author_years over contiguous ranges of authors in a process pool
+    
+    The sorted pub_year array is placed in shared memory once; each task only
+    carries the faculty records and their row offsets. Results come back in
+    task order, so the output matches the serial path exactly.
+    """
+    
+    years = np.ascontiguousarray(paper_index.years, dtype=np.float64)
+    bounds = [paper_index.bounds(record[0]) for record in records]
+    
+    chunks = np.array_split(np.arange(len(records)), workers * 4)
+    tasks = [[(records[i], bounds[i]) for i in chunk] for chunk in chunks if len(chunk) > 0]
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(years.nbytes, 1))
+    try:
+        np.ndarray(years.shape, dtype=np.float64, buffer=shm.buf)[:] = years
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_years,
+                                 initargs=(shm.name, len(years))) as pool:
+            return [result for chunk in pool.map(_analyze_gap_chunk, tasks) for result in chunk]
+    finally:
+        shm.close()
+        shm.unlink()
+
 def create_cleaning_recommendations(analysis_df, min_confidence=0.6):
     """
     Create final cleaning recommendations based on analysis
@@ -178,19 +290,21 @@ def create_cleaning_recommendations(analysis_df, min_confidence=0.6):
     
     return df
 
-def visualize_cleaning_results(analysis_df, papers_df, sample_faculty=None):
+def visualize_cleaning_results(analysis_df, papers, sample_faculty=None):
     """
     Create visualizations to help understand the cleaning results
     """
     
     if sample_faculty:
+        paper_index = as_paper_index(papers)
+        
         # Plot timeline for specific faculty members
         fig, axes = plt.subplots(len(sample_faculty), 1, figsize=(12, 3*len(sample_faculty)))
         if len(sample_faculty) == 1:
             axes = [axes]
         
         for i, ego_aid in enumerate(sample_faculty):
-            faculty_papers = papers_df[papers_df['ego_aid'] == ego_aid]
+            faculty_papers = paper_index.papers_for(ego_aid)
             faculty_info = analysis_df[analysis_df['ego_aid'] == ego_aid].iloc[0]
             
             if len(faculty_papers) > 0:
@@ -235,198 +349,309 @@ def apply_cleaning_to_faculty_data(faculty_df, analysis_df):
     
     df_clean = faculty_df.copy()
     
+    # One analysis row per author: pandas also joins missing keys to each
+    # other, and a repeated oa_uid would otherwise duplicate roster rows
+    analysis = analysis_df[['ego_aid', 'recommendation', 'confidence', 'final_suggested_year', 
+                            'cleaning_action', 'max_gap', 'reasoning']]
+    analysis = analysis.dropna(subset=['ego_aid']).drop_duplicates('ego_aid')
+    
     # Add analysis results
     df_clean = df_clean.merge(
-        analysis_df[['ego_aid', 'recommendation', 'confidence', 'final_suggested_year', 
-                    'cleaning_action', 'max_gap', 'reasoning']], 
+        analysis, 
         left_on='oa_uid', 
         right_on='ego_aid', 
         how='left'
     )
     
+    # The merge loses the roster's dtypes; hand them back as the DuckDB engine does
+    df_clean = df_clean.astype({col: faculty_df[col].dtype for col in faculty_df.columns})
+    
     # Create cleaned first_pub_year column
     df_clean['first_pub_year_original'] = df_clean['first_pub_year']
-    df_clean['first_pub_year_cleaned'] = df_clean.apply(
-        lambda row: row['final_suggested_year'] if row['cleaning_action'] == 'clean_to_suggested' 
-                   else row['first_pub_year'], axis=1
+    df_clean['first_pub_year_cleaned'] = df_clean['final_suggested_year'].astype('float64').where(
+        df_clean['cleaning_action'] == 'clean_to_suggested',
+        df_clean['first_pub_year'].astype('float64')
     )
     
     return df_clean
 
 # Example usage
-def run_complete_cleaning_pipeline(papers_df, faculty_df):
+def run_complete_cleaning_pipeline(papers, faculty_df, workers=None):
     """
     Run the complete cleaning pipeline
     """
     
+    paper_index = as_paper_index(papers)
+    
     print("Step 1: Analyzing publication gaps...")
-    analysis_df = analyze_publication_gaps(papers_df, faculty_df)
+    analysis_df = analyze_publication_gaps(paper_index, faculty_df, workers=workers)
     
     print("Step 2: Creating cleaning recommendations...")
     analysis_df = create_cleaning_recommendations(analysis_df, min_confidence=0.6)
     
     print("Step 3: Visualizing results...")
-    visualize_cleaning_results(analysis_df, papers_df)
+    visualize_cleaning_results(analysis_df, paper_index)
     
     print("Step 4: Applying cleaning to faculty data...")
     faculty_cleaned = apply_cleaning_to_faculty_data(faculty_df, analysis_df)
     
     return faculty_cleaned, analysis_df
 
-# Example usage:
-faculty_df = pd.read_csv("../static/data/academic-research-groups.csv")
-
-paper_file = "../../complex-stories/src/lib/stories/open-academic-analytics/data/raw/paper.parquet"
-papers_df = pd.read_parquet(paper_file)
-
-oa_uid2first_year={row.oa_uid:row.first_pub_year for (i,row) in faculty_df[['oa_uid', 'first_pub_year']].iterrows()}
-
-out = []
-# for all papers, check if we have faculty_first_year. 
-for i, row in papers_df.iterrows():
-    faculty_first_year = oa_uid2first_year.get(row.ego_aid)
-
-    # If we do, filter out any paper before that.
-    if faculty_first_year is not None:
-        if row.pub_year < faculty_first_year:
+def run_out_of_core_cleaning_pipeline(paper_source, faculty_df, n_partitions,
+                                      spill_dir=SPILL_DIR, workers=None):
+    """
+    Run the cleaning pipeline one author-hash partition of papers at a time
+    
+    Papers are streamed from paper_source into n_partitions files by ego_aid
+    hash. Each partition is filtered and gap-analyzed on its own and only the
+    small per-author results are kept, so peak memory is bounded by partition
+    size rather than by the size of the papers table.
+    
+    Args:
+        paper_source: paper Parquet file or dataset directory
+        faculty_df: DataFrame with faculty info including current first_pub_year
+        n_partitions: number of author hash partitions
+        spill_dir: scratch directory for the partition files
+        workers: processes for the gap analysis within each partition
+    
+    Returns:
+        (faculty_cleaned, analysis_df, PartitionedPapers with the filtered papers)
+    """
+    
+    print(f"Step 0: Partitioning papers into {n_partitions} author buckets...")
+    partitions = PartitionedPapers.spill(paper_source, spill_dir, n_partitions)
+    
+    faculty_buckets = faculty_df['oa_uid'].map(
+        lambda aid: partitions.partition_of(aid) if pd.notna(aid) else 0
+    ).to_numpy()
+    first_years = faculty_df.set_index('oa_uid')['first_pub_year']
+    
+    print("Step 1: Filtering and analyzing publication gaps per partition...")
+    results = [None] * len(faculty_df)
+    
+    for i in range(n_partitions):
+        paper_index = PaperIndex(partitions.read_partition(i)).filter_since(first_years)
+        partitions.write_partition(i, paper_index.papers)
+        
+        positions = np.flatnonzero(faculty_buckets == i)
+        if len(positions) == 0:
             continue
+        
+        part_results = gap_analysis_results(paper_index, faculty_df.iloc[positions], workers=workers)
+        for position, result in zip(positions, part_results):
+            results[position] = result
+        
+        print(f"  Partition {i+1}/{n_partitions}: {len(paper_index)} papers, {len(positions)} faculty")
+        del paper_index
+    
+    # Results are placed back in roster order, so the frame is built exactly
+    # as the in-memory pipeline builds it
+    analysis_df = pd.DataFrame(results)
+    
+    print("Step 2: Creating cleaning recommendations...")
+    analysis_df = create_cleaning_recommendations(analysis_df, min_confidence=0.6)
+    
+    print("Step 3: Visualizing results...")
+    visualize_cleaning_results(analysis_df, partitions)
+    
+    print("Step 4: Applying cleaning to faculty data...")
+    faculty_cleaned = apply_cleaning_to_faculty_data(faculty_df, analysis_df)
+    
+    return faculty_cleaned, analysis_df, partitions
 
-    out.append(row)
-
-papers_df = pd.DataFrame(out) 
-
-# papers_df.to_parquet("../../complex-stories/static/data/open-academic-analytics/paper.parquet")
-
-faculty_cleaned, analysis_results = run_complete_cleaning_pipeline(papers_df, faculty_df)
-
-# Review cases flagged for manual review
-manual_review = analysis_results[analysis_results['cleaning_action'] == 'flag_for_manual_review']
-
-print("Cases requiring manual review:")
-print(manual_review[['name', 'recommendation', 'reasoning', 'max_gap']])
-
+def run_duckdb_cleaning_pipeline(paper_path, faculty_df):
+    """
+    Run the cleaning pipeline with the filter, per-author year aggregation and
+    final merge executed by DuckDB directly over the Parquet files
+    
+    Returns:
+        (faculty_cleaned, analysis_df, SqlPapers for per-author review lookups)
+    """
+    
+    import duckdb_engine
+    
+    con = duckdb_engine.connect()
+    
+    print("Step 1: Aggregating publication years (DuckDB) and analyzing gaps...")
+    author_years = duckdb_engine.author_pub_years(paper_path, faculty_df, con=con)
+    years_by_author = dict(zip(author_years['ego_aid'], author_years['pub_years']))
+    no_years = np.empty(0, dtype=np.float64)
+    analysis_df = pd.DataFrame([
+        analyze_author_years(record, years_by_author.get(record[0], no_years))
+        for record in faculty_gap_records(faculty_df)
+    ])
+    
+    print("Step 2: Creating cleaning recommendations...")
+    analysis_df = create_cleaning_recommendations(analysis_df, min_confidence=0.6)
+    
+    print("Step 3: Visualizing results...")
+    visualize_cleaning_results(analysis_df, None)
+    
+    print("Step 4: Applying cleaning to faculty data (DuckDB)...")
+    faculty_cleaned = duckdb_engine.apply_cleaning(faculty_df, analysis_df, con=con)
+    
+    return faculty_cleaned, analysis_df, duckdb_engine.SqlPapers(paper_path, faculty_df)
 
 # =============================================================================
 # STEP 2: INTERACTIVE REVIEW
 # =============================================================================
 
+def build_pub_year_context(row, paper_index):
+    """
+    Precompute what the review prompt shows for one flagged faculty member
+    
+    Runs in the review session's prefetch thread, ahead of the prompt.
+    """
+    
+    faculty_papers = paper_index.papers_for(row['ego_aid'])
+    pub_years = faculty_papers['pub_year'].dropna().astype(int)
+    
+    def sample_papers(year):
+        sample = faculty_papers[faculty_papers['pub_year'] == year].head(2)
+        return list(zip(sample['title'], sample['authors']))
+    
+    suggested = row['suggested_first_year']
+    return {
+        'paper_count': len(faculty_papers),
+        'year_counts': pub_years.value_counts().sort_index(),
+        'early_papers': sample_papers(row['current_first_year']),
+        'suggested_papers': (
+            sample_papers(suggested) if suggested and suggested != row['current_first_year'] else []
+        ),
+    }
+
+def _print_sample_papers(papers):
+    for title, authors in papers:
+        title = title[:80] + "..." if len(str(title)) > 80 else title
+        print(f"  • {title}")
+        print(f"    Authors: {authors[:100]}...")
 
+def print_pub_year_review(position, total, row, context):
+    """Print one review prompt from its precomputed context."""
+    print(f"\n--- Review {position+1}/{total} ---")
+    print(f"Faculty: {row['name']}")
+    print(f"Current first pub year: {row['current_first_year']}")
+    print(f"Issue: {row['recommendation']} (confidence: {row['confidence']:.2f})")
+    print(f"Reasoning: {row['reasoning']}")
+    
+    if row['suggested_first_year']:
+        print(f"Suggested correction: {row['suggested_first_year']}")
+    
+    if row['max_gap']:
+        print(f"Max gap: {row['max_gap']} years at {row['gap_location']}")
+    
+    # Show publication timeline
+    if context['paper_count'] > 0:
+        year_counts = context['year_counts']
+        
+        print(f"\nPublication timeline ({context['paper_count']} total papers):")
+        
+        # Show year-by-year breakdown for first 10 years
+        first_years = year_counts.head(10)
+        for year, count in first_years.items():
+            marker = "★" if year == row['current_first_year'] else " "
+            suggested_marker = "→" if year == row['suggested_first_year'] else " "
+            print(f"  {marker}{suggested_marker} {year}: {count} papers")
+        
+        if len(year_counts) > 10:
+            print(f"  ... and {len(year_counts) - 10} more years")
+            print(f"  Last year: {year_counts.index[-1]} ({year_counts.iloc[-1]} papers)")
+        
+        # Show sample paper titles from different periods
+        if context['early_papers']:
+            print(f"\nSample early papers ({row['current_first_year']}):")
+            _print_sample_papers(context['early_papers'])
+        
+        if context['suggested_papers']:
+            print(f"\nSample papers from suggested year ({row['suggested_first_year']}):")
+            _print_sample_papers(context['suggested_papers'])
 
-def interactive_review_pub_years(analysis_df, papers_df, faculty_df):
+def pub_year_review_queue(analysis_df, recommendations=None, min_confidence=0.5):
+    """Analysis rows offered for review (default: everything except 'appears_reasonable')."""
+    if recommendations is None:
+        recommendations = set(analysis_df['recommendation']) - {'appears_reasonable'}
+    return filter_review_items(analysis_df, 'recommendation', recommendations, min_confidence=min_confidence)
+
+def interactive_review_pub_years(analysis_df, papers, faculty_df, recommendations=None,
+                                 min_confidence=0.5, prefetch=PREFETCH):
     """
     Interactive review of flagged publication years
     
     Args:
         analysis_df: Results from gap analysis with recommendations
-        papers_df: All papers data
+        papers: PaperIndex or DataFrame with all papers
         faculty_df: Original faculty data
+        recommendations: only review these recommendation types
+            (default: everything except 'appears_reasonable')
+        min_confidence: only review recommendations at or above this confidence
+        prefetch: number of upcoming cases prepared in the background
         
     Returns:
         dict: Manual corrections {ego_aid: corrected_first_pub_year}
     """
     
     # Get cases that need review
-    review_needed = analysis_df[
-        (analysis_df['recommendation'] != 'appears_reasonable') & 
-        (analysis_df['confidence'] >= 0.5)
-    ].copy()
+    review_needed = pub_year_review_queue(analysis_df, recommendations, min_confidence)
     
     print(f"\nReviewing {len(review_needed)} flagged publication years...")
-    print("Commands: (k)eep current, (s)uggested, (c)ustom year, (skip), (q)uit")
+    print("Commands: (k)eep current, (s)uggested, (c)ustom year, (skip), (g)oto N, (q)uit")
     
+    paper_index = as_paper_index(papers)
     corrections = {}
+    rows = [row for _, row in review_needed.iterrows()]
     
-    for i, (idx, row) in enumerate(review_needed.iterrows()):
-        ego_aid = row['ego_aid']
-        name = row['name']
-        
-        # Get faculty papers for context
-        faculty_papers = papers_df[papers_df['ego_aid'] == ego_aid].copy()
-        
-        print(f"\n--- Review {i+1}/{len(review_needed)} ---")
-        print(f"Faculty: {name}")
-        print(f"Current first pub year: {row['current_first_year']}")
-        print(f"Issue: {row['recommendation']} (confidence: {row['confidence']:.2f})")
-        print(f"Reasoning: {row['reasoning']}")
-        
-        if row['suggested_first_year']:
-            print(f"Suggested correction: {row['suggested_first_year']}")
-        
-        if row['max_gap']:
-            print(f"Max gap: {row['max_gap']} years at {row['gap_location']}")
-        
-        # Show publication timeline
-        if len(faculty_papers) > 0:
-            pub_years = faculty_papers['pub_year'].dropna().astype(int).sort_values()
-            year_counts = pub_years.value_counts().sort_index()
-            
-            print(f"\nPublication timeline ({len(faculty_papers)} total papers):")
-            
-            # Show year-by-year breakdown for first 10 years
-            first_years = year_counts.head(10)
-            for year, count in first_years.items():
-                marker = "★" if year == row['current_first_year'] else " "
-                suggested_marker = "→" if year == row['suggested_first_year'] else " "
-                print(f"  {marker}{suggested_marker} {year}: {count} papers")
-            
-            if len(year_counts) > 10:
-                print(f"  ... and {len(year_counts) - 10} more years")
-                print(f"  Last year: {year_counts.index[-1]} ({year_counts.iloc[-1]} papers)")
-            
-            # Show sample paper titles from different periods
-            early_papers = faculty_papers[faculty_papers['pub_year'] == row['current_first_year']]
-            if len(early_papers) > 0:
-                print(f"\nSample early papers ({row['current_first_year']}):")
-                for _, paper in early_papers.head(2).iterrows():
-                    title = paper['title'][:80] + "..." if len(str(paper['title'])) > 80 else paper['title']
-                    print(f"  • {title}")
-                    print(f"    Authors: {paper['authors'][:100]}...")
+    with ReviewSession(rows, lambda row: build_pub_year_context(row, paper_index), prefetch) as session:
+        while not session.done:
+            position, row, context = session.current()
+            ego_aid = row['ego_aid']
+            print_pub_year_review(position, len(session), row, context)
             
-            if row['suggested_first_year'] and row['suggested_first_year'] != row['current_first_year']:
-                suggested_papers = faculty_papers[faculty_papers['pub_year'] == row['suggested_first_year']]
-                if len(suggested_papers) > 0:
-                    print(f"\nSample papers from suggested year ({row['suggested_first_year']}):")
-                    for _, paper in suggested_papers.head(2).iterrows():
-                        title = paper['title'][:80] + "..." if len(str(paper['title'])) > 80 else paper['title']
-                        print(f"  • {title}")
-                        print(f"    Authors: {paper['authors'][:100]}...")
-        
-        # Get user choice
-        while True:
-            choice = input("\nChoice: (k)eep/(s)uggested/(c)ustom year/(skip)/(q)uit: ").lower().strip()
-            
-            if choice in ['k', 'keep']:
-                corrections[ego_aid] = row['current_first_year']
-                print(f"✓ Keeping current year: {row['current_first_year']}")
-                break
-                
-            elif choice in ['s', 'suggested'] and row['suggested_first_year']:
-                corrections[ego_aid] = row['suggested_first_year']
-                print(f"✓ Using suggested year: {row['suggested_first_year']}")
-                break
+            # Get user choice
+            while True:
+                choice = input("\nChoice: (k)eep/(s)uggested/(c)ustom year/(skip)/(g)oto N/(q)uit: ").lower().strip()
                 
-            elif choice in ['c', 'custom']:
-                try:
-                    custom_year = int(input("Enter custom year: "))
-                    if 1900 <= custom_year <= datetime.now().year:
-                        corrections[ego_aid] = custom_year
-                        print(f"✓ Using custom year: {custom_year}")
+                if choice in ['k', 'keep']:
+                    corrections[ego_aid] = row['current_first_year']
+                    print(f"✓ Keeping current year: {row['current_first_year']}")
+                    session.advance()
+                    break
+                    
+                elif choice in ['s', 'suggested'] and row['suggested_first_year']:
+                    corrections[ego_aid] = row['suggested_first_year']
+                    print(f"✓ Using suggested year: {row['suggested_first_year']}")
+                    session.advance()
+                    break
+                    
+                elif choice in ['c', 'custom']:
+                    try:
+                        custom_year = int(input("Enter custom year: "))
+                        if 1900 <= custom_year <= datetime.now().year:
+                            corrections[ego_aid] = custom_year
+                            print(f"✓ Using custom year: {custom_year}")
+                            session.advance()
+                            break
+                        else:
+                            print(f"Please enter a reasonable year (1900-{datetime.now().year})")
+                    except ValueError:
+                        print("Please enter a valid year")
+                        
+                elif choice in ['skip', '']:
+                    print("⏭ Skipping for now")
+                    session.advance()
+                    break
+                    
+                elif choice.startswith('g'):
+                    target = choice[1:].strip()
+                    if target.isdigit() and session.goto(int(target) - 1):
                         break
-                    else:
-                        print("Please enter a reasonable year (1900-2025)")
-                except ValueError:
-                    print("Please enter a valid year")
+                    print(f"Enter g followed by a case number (1-{len(session)})")
                     
-            elif choice in ['skip', '']:
-                print("⏭ Skipping for now")
-                break
-                
-            elif choice in ['q', 'quit']:
-                print("Exiting review...")
-                return corrections
-                
-            else:
-                print("Invalid choice. Use: k/s/c/skip/q")
+                elif choice in ['q', 'quit']:
+                    print("Exiting review...")
+                    return corrections
+                    
+                else:
+                    print("Invalid choice. Use: k/s/c/skip/g N/q")
     
     return corrections
 
@@ -473,7 +698,7 @@ def save_corrections_log(corrections, filename='pub_year_corrections.csv'):
     corrections_df.to_csv(filename, index=False)
     print(f"Corrections saved to {filename}")
 
-def run_interactive_cleaning(analysis_df, papers_df, faculty_df):
+def run_interactive_cleaning(analysis_df, papers, faculty_df):
     """
     Complete interactive cleaning workflow
     """
@@ -482,7 +707,7 @@ def run_interactive_cleaning(analysis_df, papers_df, faculty_df):
     print(f"Total cases flagged for review: {len(analysis_df[analysis_df['recommendation'] != 'appears_reasonable'])}")
     
     # Run interactive review
-    corrections = interactive_review_pub_years(analysis_df, papers_df, faculty_df)
+    corrections = interactive_review_pub_years(analysis_df, papers, faculty_df)
     
     if corrections:
         print(f"\n=== Summary ===")
@@ -503,14 +728,14 @@ def run_interactive_cleaning(analysis_df, papers_df, faculty_df):
         return faculty_df, {}
 
 # Quick review function for specific cases
-def quick_review_faculty(ego_aid, papers_df, faculty_df):
+def quick_review_faculty(ego_aid, papers, faculty_df):
     """
     Quick review of a specific faculty member's publication timeline
     """
     
     # Get faculty info
     faculty_info = faculty_df[faculty_df['oa_uid'] == ego_aid].iloc[0]
-    faculty_papers = papers_df[papers_df['ego_aid'] == ego_aid]
+    faculty_papers = as_paper_index(papers).papers_for(ego_aid)
     
     print(f"Faculty: {faculty_info['payroll_name']}")
     print(f"Current first pub year: {faculty_info['first_pub_year']}")
@@ -528,17 +753,95 @@ def quick_review_faculty(ego_aid, papers_df, faculty_df):
             print(f"  ... and {len(year_counts) - 15} more years")
     
     return faculty_papers
- 
-# First, run the gap analysis
-analysis_df = analyze_publication_gaps(papers_df, faculty_df)
-analysis_df = create_cleaning_recommendations(analysis_df)
 
-analysis_df[analysis_df.ego_aid == 'A5072094717']
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
 
-# Then run interactive review
-faculty_cleaned, corrections = run_interactive_cleaning(analysis_df, papers_df, faculty_df)
+def filter_papers_before_first_year(papers, faculty_df):
+    """Drop each author's papers published before their recorded first_pub_year."""
+    first_years = faculty_df.set_index('oa_uid')['first_pub_year']
+    return as_paper_index(papers).filter_since(first_years)
 
-faculty_cleaned = faculty_cleaned[faculty_df.columns]
+def clean_first_pub_years(faculty_df, export=True):
+    """
+    Gap analysis and interactive review for the given roster rows
+    
+    Returns:
+        (the rows with first_pub_year corrections applied, corrections,
+        index of rows whose flagged year got no decision in review)
+    """
+    
+    if ENGINE == "duckdb":
+        faculty_cleaned, analysis_df, paper_index = run_duckdb_cleaning_pipeline(PAPER_FILE, faculty_df)
+    elif OUT_OF_CORE_PARTITIONS:
+        faculty_cleaned, analysis_df, paper_index = run_out_of_core_cleaning_pipeline(
+            PAPER_FILE, faculty_df, OUT_OF_CORE_PARTITIONS, workers=GAP_WORKERS
+        )
+    else:
+        papers_df = load_harvested_papers(PAPER_FILE)
+        
+        # Papers before a faculty member's recorded first year are dropped up front
+        paper_index = filter_papers_before_first_year(papers_df, faculty_df)
+        del papers_df
+        
+        faculty_cleaned, analysis_df = run_complete_cleaning_pipeline(paper_index, faculty_df, workers=GAP_WORKERS)
+    
+    # The export covers only the authors filtered here, so delta runs skip it
+    if PAPER_EXPORT_FILE and export:
+        paper_index.to_parquet(PAPER_EXPORT_FILE)
+    elif PAPER_EXPORT_FILE:
+        print(f"Skipping paper export on a delta run (set DELTA_ONLY = False to refresh {PAPER_EXPORT_FILE})")
+    
+    # Review cases flagged for manual review
+    manual_review = analysis_df[analysis_df['cleaning_action'] == 'flag_for_manual_review']
+    
+    print("Cases requiring manual review:")
+    print(manual_review[['name', 'recommendation', 'reasoning', 'max_gap']])
+    
+    # Then run interactive review
+    faculty_cleaned, corrections = run_interactive_cleaning(analysis_df, paper_index, faculty_df)
+    
+    # Flagged years skipped or left at a quit ('keep' counts as a decision)
+    undecided = set(pub_year_review_queue(analysis_df)['ego_aid'].dropna()) - set(corrections)
+    unresolved = faculty_df.index[faculty_df['oa_uid'].isin(list(undecided)).to_numpy(dtype=bool)]
+    
+    return faculty_cleaned[faculty_df.columns], corrections, unresolved
+
+def main():
+    """Gap analysis, interactive review and save for first_pub_year cleaning."""
+    roster_df = load_roster(FACULTY_FILE)
+    
+    # Only rows added or changed since the last run need a new gap analysis,
+    # unless the papers changed
+    inputs = {'papers': input_fingerprint(PAPER_FILE)}
+    delta = stage_delta(roster_df, GAP_STAGE, inputs=inputs) if DELTA_ONLY else None
+    faculty_df = roster_df
+    if delta is not None:
+        if is_empty(delta):
+            print("✅ Roster unchanged since the last run, nothing to analyze")
+            return roster_df, {}
+        faculty_df = roster_df[delta_mask(roster_df, delta)]
+        print(f"Analyzing {len(faculty_df)} added or modified rows")
+    
+    if len(faculty_df) == 0:
+        faculty_cleaned, corrections, unresolved = faculty_df, {}, faculty_df.index[:0]
+    else:
+        faculty_cleaned, corrections, unresolved = clean_first_pub_years(faculty_df, export=delta is None)
+    
+    if delta is not None:
+        faculty_cleaned = merge_delta(roster_df, faculty_cleaned)
+    
+    # Delta runs only touch the partitions of rows that changed
+    output_delta = diff_rosters(roster_df, faculty_cleaned)
+    append_audit_log(output_delta, GAP_STAGE, 'output')
+    faculty_path = Path(FACULTY_FILE)
+    published = publish_dataset(faculty_cleaned, faculty_path.stem, faculty_path.parent,
+                                delta=combine_diffs(delta, output_delta) if delta is not None else None)
+    report_published(published)
+    save_snapshot(faculty_cleaned, GAP_STAGE, unresolved=unresolved, inputs=inputs)
+    
+    return faculty_cleaned, corrections
 
-faculty_cleaned.to_csv("../static/data/academic-research-groups.csv", index=False)
-faculty_cleaned.to_parquet("../static/data/academic-research-groups.parquet")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+OpenAlex Works Harvester
+
+Rebuilds paper.parquet locally: pages through the works of every oa_uid in the
+roster with cursor pagination, several authors at a time, and streams each page
+straight to a Parquet dataset partitioned by a hash of ego_aid. Only one page
+per worker is held in memory.
+
+Progress is checkpointed per author (last cursor and page number), so an
+interrupted harvest resumes where each author left off. Each author also
+records when it was last harvested; once that is more than REFRESH_AFTER_DAYS
+old, a rerun only pages through works updated since then and folds them into
+the author's files, replacing older copies of the same work. Works that
+OpenAlex detaches from an author are not noticed this way; delete the author's
+_state file to harvest it from scratch. Point OPENALEX_API at a local stub
+server to test without hitting api.openalex.org.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from openalex_http import get_session
+from paper_index import author_bucket
+from roster_schema import ROSTER_FILE, load_roster
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PAPER_DATASET_DIR = Path("./data/paper")
+N_BUCKETS = 32
+MAX_WORKERS = 8
+PER_PAGE = 200
+REFRESH_AFTER_DAYS = 1  # re-page finished authors for works updated since their last harvest (None: never, <= 0: every run)
+
+WORK_FIELDS = "id,doi,title,publication_year,publication_date,type,cited_by_count,authorships"
+
+PAPER_SCHEMA = pa.schema([
+    ('ego_aid', pa.string()),
+    ('work_id', pa.string()),
+    ('doi', pa.string()),
+    ('title', pa.string()),
+    ('pub_year', pa.int16()),
+    ('pub_date', pa.string()),
+    ('work_type', pa.string()),
+    ('cited_by_count', pa.int32()),
+    ('authors', pa.string()),
+])
+
+# =============================================================================
+# CHECKPOINTS
+# =============================================================================
+
+def _state_path(output_dir, ego_aid):
+    return Path(output_dir) / "_state" / f"{ego_aid}.json"
+
+def load_author_state(output_dir, ego_aid):
+    """Last saved cursor for an author, or a fresh start."""
+    path = _state_path(output_dir, ego_aid)
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'cursor': '*', 'pages': 0, 'works': 0, 'done': False,
+                'pass': 0, 'since': None, 'started': date.today().isoformat(), 'harvested_at': None}
+
+    # Checkpoints from before incremental refreshes only have their last
+    # write time to go by
+    if 'pass' not in state:
+        written = datetime.fromtimestamp(path.stat().st_mtime).date().isoformat()
+        state.update({'pass': 0, 'since': None, 'started': written,
+                      'harvested_at': written if state['done'] else None})
+    return state
+
+def save_author_state(output_dir, ego_aid, state):
+    path = _state_path(output_dir, ego_aid)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+# =============================================================================
+# HARVEST
+# =============================================================================
+
+def work_to_row(ego_aid, work):
+    """Flatten an OpenAlex work into a paper row."""
+    authorships = work.get('authorships') or []
+    return {
+        'ego_aid': ego_aid,
+        'work_id': (work.get('id') or '').replace('https://openalex.org/', ''),
+        'doi': work.get('doi'),
+        'title': work.get('title'),
+        'pub_year': work.get('publication_year'),
+        'pub_date': work.get('publication_date'),
+        'work_type': work.get('type'),
+        'cited_by_count': work.get('cited_by_count'),
+        'authors': ", ".join(
+            a['author']['display_name'] for a in authorships
+            if (a.get('author') or {}).get('display_name')
+        ),
+    }
+
+def _bucket_dir(output_dir, ego_aid):
+    return Path(output_dir) / f"bucket={author_bucket(ego_aid, N_BUCKETS):03d}"
+
+def _page_name(ego_aid, harvest_pass, page_number):
+    # Full harvests are <aid>-00000..., incremental passes <aid>-u001-00000...,
+    # which sorts the later copy of a work last
+    prefix = f"{ego_aid}-u{harvest_pass:03d}" if harvest_pass else ego_aid
+    return f"{prefix}-{page_number:05d}.parquet"
+
+def write_page(output_dir, ego_aid, page_number, rows, harvest_pass=0):
+    """Write one page of works into the author's hash partition."""
+    bucket_dir = _bucket_dir(output_dir, ego_aid)
+    bucket_dir.mkdir(parents=True, exist_ok=True)
+
+    # Named by page so a page re-fetched after a crash overwrites itself
+    table = pa.Table.from_pylist(rows, schema=PAPER_SCHEMA)
+    pq.write_table(table, bucket_dir / _page_name(ego_aid, harvest_pass, page_number), compression='zstd')
+
+def compact_author(output_dir, ego_aid):
+    """
+    Merge an author's page files into one, keeping the latest copy of each work
+
+    The merged file replaces the first page before the others are deleted, so
+    an interrupted compaction leaves duplicates for the next one to drop, never
+    missing works.
+
+    Returns:
+        number of works kept
+    """
+
+    bucket_dir = _bucket_dir(output_dir, ego_aid)
+    pages = sorted(bucket_dir.glob(f"{ego_aid}-*.parquet"))
+    if not pages:
+        return 0
+
+    df = pd.concat([pq.read_table(page).to_pandas() for page in pages], ignore_index=True)
+    df = df.drop_duplicates('work_id', keep='last')
+
+    target = bucket_dir / _page_name(ego_aid, 0, 0)
+    tmp = bucket_dir / f".{target.name}.tmp"  # hidden from dataset readers
+    pq.write_table(pa.Table.from_pandas(df, schema=PAPER_SCHEMA, preserve_index=False), tmp, compression='zstd')
+    os.replace(tmp, target)
+    for page in pages:
+        if page != target:
+            page.unlink()
+    return len(df)
+
+def start_refresh_pass(state, refresh_after_days=REFRESH_AFTER_DAYS):
+    """
+    Reopen a finished author whose last harvest is older than refresh_after_days
+
+    The new pass asks only for works updated since the day the last one started.
+    None never refreshes, and zero days or less refreshes on every run.
+    """
+
+    if not state['done'] or refresh_after_days is None:
+        return state
+
+    last = date.fromisoformat(state['harvested_at'])
+    if refresh_after_days > 0 and date.today() - last < timedelta(days=refresh_after_days):
+        return state
+
+    return {**state, 'cursor': '*', 'pages': 0, 'done': False,
+            'pass': state['pass'] + 1, 'since': last.isoformat(), 'started': date.today().isoformat()}
+
+def harvest_author(session, ego_aid, output_dir=PAPER_DATASET_DIR, refresh_after_days=REFRESH_AFTER_DAYS):
+    """
+    Page through the works of one author, resuming from the saved cursor
+
+    A finished author is re-paged for works updated since its last harvest
+    once that is older than refresh_after_days (None never refreshes).
+
+    Returns:
+        Final checkpoint state for the author
+    """
+
+    state = start_refresh_pass(load_author_state(output_dir, ego_aid), refresh_after_days)
+
+    while not state['done']:
+        work_filter = f"author.id:{ego_aid}"
+        if state['since']:
+            work_filter += f",from_updated_date:{state['since']}"
+
+        page = session.get_json("/works", {
+            'filter': work_filter,
+            'select': WORK_FIELDS,
+            'per-page': PER_PAGE,
+            'cursor': state['cursor'],
+        }, revalidate=False)
+
+        results = page.get('results') or []
+        if results:
+            write_page(output_dir, ego_aid, state['pages'], [work_to_row(ego_aid, w) for w in results],
+                       harvest_pass=state['pass'])
+
+        next_cursor = (page.get('meta') or {}).get('next_cursor')
+        state = {
+            **state,
+            'cursor': next_cursor,
+            'pages': state['pages'] + (1 if results else 0),
+            'works': state['works'] + (len(results) if not state['pass'] else 0),
+            'done': not results or not next_cursor,
+        }
+
+        if state['done']:
+            # Fold updated works into the author's files
+            if state['pass'] and state['pages']:
+                state['works'] = compact_author(output_dir, ego_aid)
+            state['harvested_at'] = state['started']
+        save_author_state(output_dir, ego_aid, state)
+
+    return state
+
+def harvest_works(oa_uids, output_dir=PAPER_DATASET_DIR, session=None, max_workers=MAX_WORKERS,
+                  refresh_after_days=REFRESH_AFTER_DAYS):
+    """
+    Harvest works for many authors concurrently
+
+    Args:
+        oa_uids: OpenAlex author IDs (A123...)
+        output_dir: root of the partitioned Parquet dataset
+        session: OpenAlexSession (defaults to the shared one)
+        max_workers: authors fetched in parallel
+        refresh_after_days: re-page finished authors harvested longer ago than this
+
+    Returns:
+        dict of ego_aid -> works count, and a list of (ego_aid, error) failures
+    """
+
+    session = session or get_session()
+    output_dir = Path(output_dir)
+    (output_dir / "_state").mkdir(parents=True, exist_ok=True)
+
+    oa_uids = sorted({aid for aid in oa_uids if isinstance(aid, str) and aid})
+    works = {}
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(harvest_author, session, aid, output_dir, refresh_after_days): aid for aid in oa_uids}
+        for i, future in enumerate(as_completed(futures)):
+            aid = futures[future]
+            try:
+                state = future.result()
+                works[aid] = state['works']
+                print(f"Harvested {i+1}/{len(oa_uids)}: {aid} ({state['works']} works)")
+            except Exception as e:
+                failures.append((aid, str(e)))
+                print(f"Error for {aid}: {e} (will resume on next run)")
+
+    return works, failures
+
+def load_harvested_papers(output_dir=PAPER_DATASET_DIR, columns=None):
+    """Read the harvested dataset back as a papers DataFrame."""
+    df = pd.read_parquet(output_dir, columns=columns)
+    return df.drop(columns=['bucket'], errors='ignore')
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main():
+    """Harvest works for every author in the roster."""
+    print("📚 OpenAlex Works Harvester")
+    print("=" * 50)
+
+    faculty_df = load_roster(ROSTER_FILE)
+    works, failures = harvest_works(faculty_df['oa_uid'].dropna())
+
+    print(f"\n✅ Harvested {sum(works.values())} works for {len(works)} authors")
+    if failures:
+        print(f"⚠️  {len(failures)} authors failed, rerun to resume them")
+    print(f"   Saved to: {PAPER_DATASET_DIR}")
+    get_session().report()
+
+    return works, failures
+
+if __name__ == "__main__":
+    main()
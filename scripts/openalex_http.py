@@ -0,0 +1,185 @@
+"""
+Shared OpenAlex HTTP Layer
+
+One pooled, keep-alive requests session for every script that talks to the
+OpenAlex API. Responses are stored on disk together with their ETag and
+Last-Modified headers, and later requests for the same URL are sent as
+conditional requests, so refreshing unchanged data mostly costs 304s.
+
+The base URL is configurable, which lets the scripts run against a local mock
+server (e.g. http.server) instead of api.openalex.org.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+OPENALEX_API = os.environ.get("OPENALEX_API", "https://api.openalex.org")
+OPENALEX_EMAIL = os.environ.get("OPENALEX_EMAIL")  # joins the polite pool
+HTTP_CACHE_DIR = Path("./.openalex_http_cache")
+POOL_SIZE = 16
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+
+# =============================================================================
+# SESSION
+# =============================================================================
+
+class OpenAlexSession:
+    """Pooled OpenAlex client with ETag/If-Modified-Since revalidation."""
+
+    def __init__(self, base_url=OPENALEX_API, cache_dir=HTTP_CACHE_DIR,
+                 pool_size=POOL_SIZE, email=OPENALEX_EMAIL, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.email = email
+        self.timeout = timeout
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # -------------------------------------------------------------------------
+    # Conditional GET with on-disk cache
+    # -------------------------------------------------------------------------
+
+    def _cache_path(self, url, params):
+        key = json.dumps([url, sorted((params or {}).items())], default=str)
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def _read_cache(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self, path, entry):
+        # Write then rename so concurrent readers never see a partial file
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def get_json(self, path, params=None, revalidate=True):
+        """
+        GET an API path and return the decoded JSON body
+
+        Args:
+            path: API path such as "/authors" or a full URL
+            params: query parameters
+            revalidate: use the on-disk cache with conditional requests;
+                pass False for one-off pages (e.g. cursor pagination)
+        """
+
+        url = path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+        params = dict(params or {})
+        if self.email:
+            params.setdefault('mailto', self.email)
+
+        use_cache = revalidate and self.cache_dir is not None
+        cache_path = self._cache_path(url, params) if use_cache else None
+        entry = self._read_cache(cache_path) if use_cache else None
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry:
+            self._count('not_modified')
+            return entry['body']
+
+        response.raise_for_status()
+        body = response.json()
+        self._count('fetched')
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if use_cache and (etag or last_modified):
+            self._write_cache(cache_path, {'etag': etag, 'last_modified': last_modified, 'body': body})
+
+        return body
+
+    # -------------------------------------------------------------------------
+    # OpenAlex endpoints
+    # -------------------------------------------------------------------------
+
+    def search_authors(self, name, institution_id=None, per_page=25, revalidate=True):
+        """Search authors by name, optionally restricted to one institution."""
+        params = {'search': name, 'per-page': per_page}
+        if institution_id:
+            params['filter'] = f"affiliations.institution.id:{institution_id}"
+        return self.get_json("/authors", params, revalidate=revalidate)['results']
+
+    def get_author(self, author_id):
+        """Fetch a single author record by OpenAlex ID or URL."""
+        return self.get_json(f"/authors/{author_id.split('/')[-1]}")
+
+    def report(self):
+        """Print request counts for this session."""
+        total = sum(self.stats.values())
+        print(f"OpenAlex requests: {total} "
+              f"({self.stats['fetched']} fetched, {self.stats['not_modified']} not modified)")
+
+# =============================================================================
+# SHARED INSTANCE
+# =============================================================================
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+def get_session():
+    """Return the process-wide OpenAlex session, creating it on first use."""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = OpenAlexSession()
+        return _shared_session
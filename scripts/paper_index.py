@@ -0,0 +1,236 @@
+"""
+Sorted Paper Index
+
+Stores papers sorted by (ego_aid, pub_year) together with per-author offset
+arrays, so that "papers for author X since year Y" is two dictionary/binary
+search lookups returning a contiguous slice instead of a boolean scan over the
+whole papers frame.
+"""
+
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+def author_bucket(ego_aid, n_buckets):
+    """Stable hash partition of an author ID (unlike hash(), same across runs)."""
+    return zlib.crc32(str(ego_aid).encode('utf-8')) % n_buckets
+
+class PaperIndex:
+    """
+    Papers sorted by (ego_aid, pub_year) with per-author row offsets
+
+    Rows for author i live in papers.iloc[offsets[i]:offsets[i + 1]], with
+    pub_year ascending and missing years last.
+    """
+
+    def __init__(self, papers_df, presorted=False):
+        if not presorted:
+            papers_df = papers_df.sort_values(
+                ['ego_aid', 'pub_year'], kind='mergesort', na_position='last'
+            )
+        self.papers = papers_df.reset_index(drop=True)
+
+        # Codes increase monotonically along the sorted column, so author
+        # boundaries are wherever the code changes
+        codes, authors = pd.factorize(self.papers['ego_aid'], use_na_sentinel=False)
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        self.offsets = np.concatenate(([0], boundaries, [len(codes)])).astype(np.int64)
+        self.authors = np.asarray(authors, dtype=object)
+        self.years = self.papers['pub_year'].to_numpy(dtype='float64', na_value=np.nan)
+        self._position = {aid: i for i, aid in enumerate(self.authors) if not pd.isna(aid)}
+
+        if len(codes) == 0:
+            self.offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.papers)
+
+    def __contains__(self, ego_aid):
+        return ego_aid in self._position
+
+    def bounds(self, ego_aid, since=None):
+        """
+        Row range [start, end) of an author's papers, optionally from a year on
+
+        Unknown authors get an empty range. Papers without a pub_year sort
+        last and are kept by `since`, matching filter_since.
+        """
+
+        i = self._position.get(ego_aid)
+        if i is None:
+            return 0, 0
+
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if since is not None and not pd.isna(since):
+            # NaN sorts last, so a left bisect skips only the earlier years
+            start += np.searchsorted(self.years[start:end], since, side='left')
+        return int(start), int(end)
+
+    def count(self, ego_aid):
+        start, end = self.bounds(ego_aid)
+        return end - start
+
+    def years_for(self, ego_aid, since=None):
+        """Sorted pub_year array for an author (a view, NaN years last)."""
+        start, end = self.bounds(ego_aid, since)
+        return self.years[start:end]
+
+    def papers_for(self, ego_aid, since=None):
+        """An author's papers as a slice of the sorted frame."""
+        start, end = self.bounds(ego_aid, since)
+        return self.papers.iloc[start:end]
+
+    def filter_since(self, first_years):
+        """
+        Drop each author's papers published before their first_pub_year
+
+        Args:
+            first_years: mapping (dict or Series) of ego_aid -> first_pub_year;
+                authors missing from it, or with a missing year, keep every paper
+
+        Returns:
+            New PaperIndex over the remaining papers
+        """
+
+        first_years = pd.Series(first_years, dtype='object')
+        first_years = first_years[first_years.notna() & first_years.index.notna()]
+        first_years = first_years[~first_years.index.duplicated(keep='last')]
+
+        author_cutoff = pd.Series(self.authors).map(first_years).astype('float64').to_numpy()
+        row_cutoff = np.repeat(author_cutoff, np.diff(self.offsets))
+
+        # Comparisons against NaN are False, so rows without a cutoff or
+        # without a pub_year are kept, as in the row-by-row filter
+        keep = ~(self.years < row_cutoff)
+        return PaperIndex(self.papers[keep], presorted=True)
+
+    def to_parquet(self, path):
+        """Export the (sorted) papers table."""
+        self.papers.to_parquet(path, index=False)
+
+def as_paper_index(papers):
+    """
+    Accept a PaperIndex, a papers DataFrame, or any object with the same
+    papers_for/years_for lookups (PartitionedPapers, duckdb_engine.SqlPapers)
+    """
+    if isinstance(papers, pd.DataFrame):
+        return PaperIndex(papers)
+    return papers
+
+class PartitionedPapers:
+    """
+    Papers spilled to one Parquet file per author hash bucket
+
+    All papers of an author land in the same partition, so per-author work
+    can run one partition at a time with memory bounded by partition size.
+    Every partition is written with the spill schema, so they can be read
+    back as one dataset.
+    """
+
+    def __init__(self, directory, n_partitions, schema=None):
+        self.directory = Path(directory)
+        self.n_partitions = n_partitions
+        self._schema = schema
+        self._lock = threading.Lock()
+        self._loaded = (None, None)
+
+    @property
+    def schema(self):
+        """Arrow schema shared by all partitions (read from disk if not spilled here)."""
+        if self._schema is None:
+            self._schema = pq.read_schema(self.partition_path(0)).remove_metadata()
+        return self._schema
+
+    @classmethod
+    def spill(cls, source, directory, n_partitions, columns=None, batch_size=100_000):
+        """
+        Stream a Parquet file or dataset into per-bucket partition files
+
+        Args:
+            source: Parquet file or directory (hive partitioning is understood)
+            directory: where to write part-NNN.parquet files
+            n_partitions: number of author hash buckets
+            columns: columns to keep (default: all but a 'bucket' partition key)
+            batch_size: rows read per batch
+        """
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        dataset = ds.dataset(source, format='parquet', partitioning='hive')
+        if columns is None:
+            columns = [name for name in dataset.schema.names if name != 'bucket']
+
+        schema = pa.schema([dataset.schema.field(name) for name in columns])
+        parts = cls(directory, n_partitions, schema)
+        writers = [pq.ParquetWriter(parts.partition_path(i), schema) for i in range(n_partitions)]
+
+        try:
+            for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+                # Hash each distinct author once per batch; null IDs go to
+                # the trailing slot, i.e. partition 0
+                encoded = pc.dictionary_encode(batch.column('ego_aid'))
+                bucket_of_value = np.array(
+                    [author_bucket(aid, n_partitions) for aid in encoded.dictionary.to_pylist()] + [0],
+                    dtype=np.int64,
+                )
+                indices = encoded.indices.fill_null(len(bucket_of_value) - 1).to_numpy()
+                row_buckets = bucket_of_value[indices]
+                for i in np.unique(row_buckets):
+                    writers[i].write_batch(batch.filter(pa.array(row_buckets == i)))
+        finally:
+            for writer in writers:
+                writer.close()
+
+        return parts
+
+    def partition_path(self, i):
+        return self.directory / f"part-{i:03d}.parquet"
+
+    def partition_of(self, ego_aid):
+        return author_bucket(ego_aid, self.n_partitions)
+
+    def read_partition(self, i):
+        """Papers of one partition as a DataFrame."""
+        return pd.read_parquet(self.partition_path(i))
+
+    def write_partition(self, i, papers_df):
+        # pandas would infer the types again (a pub_year with nulls turns
+        # into double), so convert with the partitions' own schema
+        table = pa.Table.from_pandas(papers_df, schema=self.schema, preserve_index=False)
+        pq.write_table(table, self.partition_path(i))
+        with self._lock:
+            if self._loaded[0] == i:
+                self._loaded = (None, None)
+
+    def load_index(self, i):
+        """PaperIndex over one partition (the last one loaded is kept)."""
+        with self._lock:
+            if self._loaded[0] != i:
+                self._loaded = (i, PaperIndex(self.read_partition(i)))
+            return self._loaded[1]
+
+    def years_for(self, ego_aid, since=None):
+        return self.load_index(self.partition_of(ego_aid)).years_for(ego_aid, since)
+
+    def papers_for(self, ego_aid, since=None):
+        return self.load_index(self.partition_of(ego_aid)).papers_for(ego_aid, since)
+
+    def to_parquet(self, path):
+        """Export all partitions into one Parquet file, a partition at a time."""
+        writer = None
+        try:
+            for i in range(self.n_partitions):
+                table = pq.read_table(self.partition_path(i), schema=self.schema)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, self.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
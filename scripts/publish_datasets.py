@@ -0,0 +1,312 @@
+"""
+Dataset Publishing
+
+Single save step for everything written to static/data. A dataset is
+published as:
+
+- <name>.csv, plus precompressed <name>.csv.gz / <name>.csv.br copies that a
+  static host can serve with Content-Encoding instead of the raw CSV
+- <name>.parquet, zstd-compressed with row groups sized for HTTP range reads
+- optionally <name>/by-<column>/<column>=<value>/part-0.parquet, a hive
+  layout so consumers can fetch one college or payroll year at a time
+
+Given a roster diff, only the partitions holding changed rows are rewritten.
+
+Every file is written next to its target and renamed into place, and the
+dataset catalog is refreshed afterwards. Datasets produced in chunks (e.g. a
+streamed roster) can be published without holding more than one chunk.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from build_catalog import CATALOG_FILE, build_catalog, write_catalog
+from roster_diff import is_empty
+from roster_schema import DATA_DIR
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 9
+TARGET_ROW_GROUP_BYTES = 8 * 1024 * 1024  # in-memory size per row group
+MIN_ROW_GROUP_ROWS = 1_000
+PARTITION_BY = ()  # e.g. ('college', 'payroll_year')
+CSV_ENCODINGS = {'gzip': '.gz', 'brotli': '.br'}
+COPY_BLOCK_SIZE = 1 << 20
+
+# =============================================================================
+# PARQUET
+# =============================================================================
+
+def row_group_rows(df, target_bytes=TARGET_ROW_GROUP_BYTES):
+    """Rows per row group so that each group holds about target_bytes of data."""
+    if len(df) == 0:
+        return MIN_ROW_GROUP_ROWS
+    row_bytes = df.memory_usage(index=False, deep=True).sum() / len(df)
+    return max(MIN_ROW_GROUP_ROWS, int(target_bytes // max(row_bytes, 1)))
+
+def _to_table(df):
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def write_parquet(df, path):
+    """Write a zstd Parquet file with tuned row groups."""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    pq.write_table(
+        _to_table(df), tmp,
+        compression=PARQUET_COMPRESSION,
+        compression_level=PARQUET_COMPRESSION_LEVEL,
+        row_group_size=row_group_rows(df),
+    )
+    os.replace(tmp, path)
+    return path
+
+def _partition_table(df, column):
+    table = _to_table(df)
+    field = table.schema.field(column)
+    if pa.types.is_dictionary(field.type):
+        # Partition on the plain values rather than dictionary-typed keys
+        i = table.schema.get_field_index(column)
+        table = table.set_column(i, column, table.column(column).cast(field.type.value_type))
+    return table, ds.partitioning(pa.schema([table.schema.field(column)]), flavor='hive')
+
+def _plain_schema(table):
+    """Schema with dictionary (categorical) columns stored as their values."""
+    return pa.schema([
+        field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ])
+
+def _write_hive(data, directory, partitioning, rows):
+    """Write a table or dataset (scanned in batches) as a hive layout."""
+    if directory.exists():
+        shutil.rmtree(directory)
+    num_rows = data.num_rows if isinstance(data, pa.Table) else data.count_rows()
+    ds.write_dataset(
+        data, directory,
+        format='parquet',
+        partitioning=partitioning,
+        file_options=ds.ParquetFileFormat().make_write_options(
+            compression=PARQUET_COMPRESSION, compression_level=PARQUET_COMPRESSION_LEVEL,
+        ),
+        basename_template='part-{i}.parquet',
+        max_rows_per_group=rows,
+        min_rows_per_group=min(rows, num_rows) or 1,
+    )
+
+def _swap_dir(tmp, directory):
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp, directory)
+
+def write_partitioned(df, directory, column, values=None):
+    """
+    Write a hive-partitioned copy of df split on one column
+
+    Args:
+        values: only rewrite the partitions of these column values (e.g. the
+            ones touched by a roster diff); None rewrites the whole layout
+
+    Partitions are swapped into place, and partitions whose value no longer
+    occurs are removed.
+
+    Returns:
+        the Parquet files written
+    """
+
+    directory = Path(directory)
+    tmp = directory.with_name(directory.name + '.tmp')
+    table, partitioning = _partition_table(df, column)
+    rows = row_group_rows(df)
+
+    if values is None or not directory.exists():
+        _write_hive(table, tmp, partitioning, rows)
+        _swap_dir(tmp, directory)
+        return sorted(directory.rglob('*.parquet'))
+
+    field = table.schema.field(column)
+    values = [v for v in pd.unique(pd.Series(list(values), dtype=object))]
+    present = [v for v in values if not pd.isna(v)]
+
+    keep = pc.is_in(table.column(column), value_set=pa.array(present, type=field.type))
+    if len(present) < len(values):
+        keep = pc.or_(keep, pc.is_null(table.column(column)))
+    changed = table.filter(keep)
+
+    # Every touched value may have lost its last row; then there is nothing
+    # to write and the old partitions are only removed
+    if changed.num_rows:
+        _write_hive(changed, tmp, partitioning, rows)
+    elif tmp.exists():
+        shutil.rmtree(tmp)
+
+    written = []
+    for value in values:
+        expression = pc.field(column).is_null() if pd.isna(value) else pc.field(column) == pa.scalar(value, field.type)
+        part = partitioning.format(expression)[0]
+        if (directory / part).exists():
+            shutil.rmtree(directory / part)
+        if (tmp / part).exists():
+            os.replace(tmp / part, directory / part)
+            written += sorted((directory / part).rglob('*.parquet'))
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    return written
+
+def changed_values(delta, column):
+    """Values of column on either side of the rows a roster diff touched."""
+    frames = [delta[part][column] for part in ('added', 'removed', 'modified', 'modified_before')
+              if column in delta[part].columns]
+    return pd.concat([f.astype(object) for f in frames]).tolist() if frames else []
+
+# =============================================================================
+# CSV
+# =============================================================================
+
+def write_csv(df, path):
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+def precompress(path, encoding):
+    """Write path + .gz/.br next to a file, streaming it through the codec."""
+    path = Path(path)
+    target = path.with_name(path.name + CSV_ENCODINGS[encoding])
+    tmp = target.with_name(target.name + '.tmp')
+
+    with open(path, 'rb') as src, pa.CompressedOutputStream(str(tmp), encoding) as out:
+        for block in iter(lambda: src.read(COPY_BLOCK_SIZE), b''):
+            out.write(block)
+    os.replace(tmp, target)
+    return target
+
+# =============================================================================
+# PUBLISH
+# =============================================================================
+
+def publish_dataset(df, name, data_dir=DATA_DIR, partition_by=PARTITION_BY,
+                    csv_encodings=tuple(CSV_ENCODINGS), update_catalog=True, delta=None):
+    """
+    Publish a dataset in every format the site serves
+
+    Args:
+        df: dataset to publish
+        name: file stem, e.g. 'academic-research-groups'
+        data_dir: publishing root (static/data)
+        partition_by: columns to write a partitioned layout for
+        csv_encodings: precompressed CSV variants ('gzip', 'brotli')
+        update_catalog: refresh catalog.json in data_dir afterwards
+        delta: roster_diff.diff_rosters of the published data against df;
+            nothing is written when it is empty, and partitioned layouts
+            only rewrite the partitions it touches
+
+    Returns:
+        dict of written path -> size in bytes
+    """
+
+    if delta is not None and is_empty(delta):
+        print(f"{name} unchanged, nothing to publish")
+        return {}
+
+    data_dir = Path(data_dir)
+    csv_path = write_csv(df, data_dir / f"{name}.csv")
+    written = [csv_path, write_parquet(df, data_dir / f"{name}.parquet")]
+    written += [precompress(csv_path, encoding) for encoding in csv_encodings]
+
+    for column in partition_by:
+        values = changed_values(delta, column) if delta is not None else None
+        written += write_partitioned(df, data_dir / name / f"by-{column}", column, values)
+
+    if update_catalog:
+        catalog_path = data_dir / CATALOG_FILE.name
+        write_catalog(build_catalog(data_dir, catalog_path)[0], catalog_path)
+
+    return {str(path): path.stat().st_size for path in written}
+
+def publish_chunks(chunks, name, data_dir=DATA_DIR, partition_by=PARTITION_BY,
+                   csv_encodings=tuple(CSV_ENCODINGS), update_catalog=True):
+    """
+    Publish a dataset that arrives in chunks, holding one chunk at a time
+
+    Writes the same files as publish_dataset. Categorical columns are stored
+    as plain values in the Parquet copy, since their categories can differ
+    between chunks; partitioned layouts are rebuilt in full by scanning the
+    written Parquet file.
+
+    Args:
+        chunks: iterable of DataFrames sharing one set of columns
+        name, data_dir, partition_by, csv_encodings, update_catalog: as in
+            publish_dataset
+
+    Returns:
+        dict of written path -> size in bytes
+    """
+
+    data_dir = Path(data_dir)
+    csv_path = data_dir / f"{name}.csv"
+    parquet_path = data_dir / f"{name}.parquet"
+    csv_tmp = csv_path.with_name(csv_path.name + '.tmp')
+    parquet_tmp = parquet_path.with_name(parquet_path.name + '.tmp')
+
+    writer = None
+    rows = MIN_ROW_GROUP_ROWS
+    try:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(csv_tmp, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+
+            table = _to_table(chunk)
+            if writer is None:
+                schema = _plain_schema(table)
+                rows = row_group_rows(chunk)
+                writer = pq.ParquetWriter(
+                    parquet_tmp, schema,
+                    compression=PARQUET_COMPRESSION,
+                    compression_level=PARQUET_COMPRESSION_LEVEL,
+                )
+            writer.write_table(table.cast(schema), row_group_size=rows)
+
+        if writer is None:
+            raise ValueError(f"no chunks to publish for {name}")
+        writer.close()
+        os.replace(csv_tmp, csv_path)
+        os.replace(parquet_tmp, parquet_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        for tmp in (csv_tmp, parquet_tmp):
+            if tmp.exists():
+                tmp.unlink()
+
+    written = [csv_path, parquet_path]
+    written += [precompress(csv_path, encoding) for encoding in csv_encodings]
+
+    source = ds.dataset(parquet_path)
+    for column in partition_by:
+        directory = data_dir / name / f"by-{column}"
+        tmp = directory.with_name(directory.name + '.tmp')
+        partitioning = ds.partitioning(pa.schema([source.schema.field(column)]), flavor='hive')
+        _write_hive(source, tmp, partitioning, rows)
+        _swap_dir(tmp, directory)
+        written += sorted(directory.rglob('*.parquet'))
+
+    if update_catalog:
+        catalog_path = data_dir / CATALOG_FILE.name
+        write_catalog(build_catalog(data_dir, catalog_path)[0], catalog_path)
+
+    return {str(path): path.stat().st_size for path in written}
+
+def report_published(sizes):
+    """Print the published files and their sizes."""
+    for path, size in sizes.items():
+        print(f"   {path}: {size:,} bytes")
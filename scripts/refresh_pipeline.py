@@ -0,0 +1,384 @@
+"""
+Refresh Orchestrator
+
+Runs the whole refresh as a DAG of stages instead of running
+augment_faculty_openalex.py and fix_first_pub_year.py by hand:
+
+    roster ──> search ──> scoring ──┬──> harvest ──> gaps
+                                    └──> publish
+
+Stages exchange data only through Parquet artifacts in ARTIFACT_DIR. A stage
+is skipped when the hashes of its inputs, its code (the stage function and
+the modules it calls) and its settings match its last successful run and its
+outputs are still on disk, so a refresh only re-executes what changed; a
+stage that reruns but produces identical output doesn't invalidate the
+stages after it. Publishing writes back to the roster the refresh started
+from; that write is recorded as already seen, so it doesn't count as a new
+input on the next run.
+
+Stages run on an asyncio loop with a bounded thread pool, so independent
+branches (publishing vs. the works harvest and gap analysis) overlap, and
+each stage keeps its own bounded worker pool inside. At the end the critical
+path (the chain of stages that determined the wall time) is reported.
+
+The orchestrator is non-interactive: high-confidence and unflagged medium
+matches fill in missing oa_uids, and nothing else in the roster changes.
+Matches needing review stay in matches.parquet, and the gap analysis with
+its suggested first_pub_year corrections in gap_analysis.parquet, for the
+interactive scripts to pick up.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+import augment_faculty_openalex as matcher
+import build_catalog
+import fix_first_pub_year as gaps
+import harvest_openalex_works as harvester
+import openalex_http
+import paper_index
+import publish_datasets
+import review_session
+import roster_diff
+import roster_schema
+import score_cache
+from build_catalog import file_sha256
+from harvest_openalex_works import PAPER_DATASET_DIR, harvest_works, load_harvested_papers
+from publish_datasets import publish_dataset, report_published
+from roster_diff import diff_rosters, input_fingerprint
+from roster_schema import ROSTER_FILE, load_roster
+from score_cache import scorer_version
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+ARTIFACT_DIR = Path("./data/refresh")
+STATE_FILE = ARTIFACT_DIR / "_state.json"
+MAX_PARALLEL_STAGES = 2
+GAP_WORKERS = gaps.GAP_WORKERS
+
+ARTIFACTS = {
+    'roster_source': Path(ROSTER_FILE),
+    'roster': ARTIFACT_DIR / "roster.parquet",
+    'search_names': ARTIFACT_DIR / "search_names.parquet",
+    'candidates': ARTIFACT_DIR / "candidates.parquet",
+    'matches': ARTIFACT_DIR / "matches.parquet",
+    'roster_matched': ARTIFACT_DIR / "roster_matched.parquet",
+    'papers': PAPER_DATASET_DIR,
+    'gap_analysis': ARTIFACT_DIR / "gap_analysis.parquet",
+    'published': Path(ROSTER_FILE),
+}
+
+# =============================================================================
+# ARTIFACTS
+# =============================================================================
+
+def artifact_hash(name):
+    return input_fingerprint(ARTIFACTS[name])
+
+def write_artifact(df, name):
+    path = ARTIFACTS[name]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_state(state, path=STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+# =============================================================================
+# STAGES
+# =============================================================================
+
+def run_roster():
+    """Typed roster plus the distinct names for the search stage."""
+    roster = load_roster(ARTIFACTS['roster_source'])
+    write_artifact(roster, 'roster')
+
+    names = matcher.add_search_names(roster).drop_duplicates('search_key')
+    write_artifact(names[['search_key', 'search_name']].reset_index(drop=True), 'search_names')
+
+def run_search():
+    """OpenAlex candidates per distinct name, one row per candidate."""
+    names = pd.read_parquet(ARTIFACTS['search_names'])
+    search_groups = dict(zip(names['search_key'], names['search_name']))
+    raw_search_results = matcher.search_openalex_for_faculty(search_groups, use_cache=True)
+
+    rows = [
+        {'search_key': key, 'position': position, 'payload': json.dumps(author, sort_keys=True)}
+        for key in search_groups
+        for position, author in enumerate(raw_search_results.get(key) or [])
+    ]
+    write_artifact(pd.DataFrame(rows, columns=['search_key', 'position', 'payload']), 'candidates')
+
+def run_scoring():
+    """Score candidates and fill in missing oa_uids from auto-approved matches."""
+    roster = matcher.add_search_names(load_roster(ARTIFACTS['roster']))
+    candidates = pd.read_parquet(ARTIFACTS['candidates']).sort_values(['search_key', 'position'])
+
+    search_groups = roster.drop_duplicates('search_key').set_index('search_key')['search_name'].to_dict()
+    raw_search_results = {
+        key: [json.loads(payload) for payload in group['payload']]
+        for key, group in candidates.groupby('search_key', sort=False)
+    }
+
+    matches_df = matcher.score_search_results(search_groups, raw_search_results)
+    matches_df['openalex_id'] = matches_df['openalex_id'].str.replace('https://openalex.org/', '', regex=False)
+    write_artifact(matches_df, 'matches')
+
+    # Existing IDs are never overwritten here; conflicts go through the
+    # interactive script
+    approved = matcher.auto_approved_matches(matches_df)
+    matched = roster['search_key'].map(approved)
+    roster['oa_uid'] = roster['oa_uid'].fillna(matched.astype(roster['oa_uid'].dtype))
+    write_artifact(roster.drop(columns=['search_name', 'search_key']), 'roster_matched')
+
+def run_harvest():
+    """Harvest (or incrementally refresh) works for every matched author."""
+    author_ids = pd.read_parquet(ARTIFACTS['roster_matched'], columns=['oa_uid'])['oa_uid'].dropna()
+    _, failures = harvest_works(author_ids, ARTIFACTS['papers'])
+    if failures:
+        raise RuntimeError(f"{len(failures)} authors failed to harvest, rerun to resume them")
+
+def run_gaps():
+    """Gap analysis and suggested first_pub_year corrections; the roster itself is left alone."""
+    roster = load_roster(ARTIFACTS['roster_matched'])
+    paper_index = gaps.filter_papers_before_first_year(load_harvested_papers(ARTIFACTS['papers']), roster)
+    analysis_df = gaps.analyze_publication_gaps(paper_index, roster, workers=GAP_WORKERS)
+    analysis_df = gaps.create_cleaning_recommendations(analysis_df, min_confidence=0.6)
+    write_artifact(analysis_df.astype({'gap_location': 'string', 'suggested_first_year': 'float64',
+                                       'final_suggested_year': 'float64'}), 'gap_analysis')
+
+def run_publish():
+    """Publish the matched roster (only the partitions that changed)."""
+    published_path = ARTIFACTS['published']
+    roster = load_roster(ARTIFACTS['roster_matched'])
+    delta = diff_rosters(load_roster(published_path), roster) if published_path.exists() else None
+    report_published(publish_dataset(roster, published_path.stem, published_path.parent, delta=delta))
+
+def harvest_window():
+    """
+    Changes once per harvester refresh interval, so finished authors get re-paged
+
+    With refresh disabled (None) the window never changes; an interval of
+    zero days or less refreshes on every run, so the window does too.
+    """
+
+    days = harvester.REFRESH_AFTER_DAYS
+    if days is None:
+        return None
+    if days <= 0:
+        return datetime.now().isoformat()
+    return date.today().toordinal() // days
+
+class Stage:
+    """
+    A pipeline step with named input and output artifacts
+
+    modules are the modules whose functions the stage calls; their source
+    is part of the stage's fingerprint. settings is a dict, or a function
+    returning one, of anything else the output depends on.
+    """
+
+    def __init__(self, name, run, inputs, outputs, modules=(), settings=None):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.modules = modules
+        self.settings = settings
+
+    def code_version(self):
+        settings = self.settings() if callable(self.settings) else self.settings
+        sources = {module.__name__: file_sha256(module.__file__) for module in self.modules}
+        return scorer_version(self.run, extra={'modules': sources, 'settings': settings})
+
+    def fingerprint(self):
+        """Hash of the stage code, its settings and the content of its inputs."""
+        inputs = {name: artifact_hash(name) for name in self.inputs}
+        return hashlib.sha256(json.dumps([self.code_version(), inputs], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def outputs_intact(self, record):
+        return all(artifact_hash(name) == record['outputs'].get(name) for name in self.outputs)
+
+STAGES = [
+    Stage('roster', run_roster, ['roster_source'], ['roster', 'search_names'],
+          [roster_schema, matcher]),
+    Stage('search', run_search, ['search_names'], ['candidates'],
+          [matcher, openalex_http]),
+    Stage('scoring', run_scoring, ['roster', 'candidates'], ['matches', 'roster_matched'],
+          [matcher, score_cache, roster_schema]),
+    Stage('harvest', run_harvest, ['roster_matched'], ['papers'],
+          [harvester, openalex_http, paper_index], settings=lambda: {'window': harvest_window()}),
+    Stage('gaps', run_gaps, ['roster_matched', 'papers'], ['gap_analysis'],
+          [gaps, paper_index, review_session, harvester, roster_schema]),
+    Stage('publish', run_publish, ['roster_matched'], ['published'],
+          [publish_datasets, build_catalog, roster_diff, roster_schema]),
+]
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+def stage_dependencies(stages):
+    """Stage name -> names of the stages producing its inputs."""
+    producer = {output: stage.name for stage in stages for output in stage.outputs}
+    return {
+        stage.name: sorted({producer[name] for name in stage.inputs if name in producer and producer[name] != stage.name})
+        for stage in stages
+    }
+
+def acknowledge_write_back(stage, stages, state, seen):
+    """
+    Record a stage's writes to files that other stages read as already seen
+
+    Publishing overwrites the roster that the roster stage started from. That
+    is the pipeline's own change, not new input, so a stage that consumed the
+    file earlier in this run gets its fingerprint updated to the new content.
+    """
+
+    written = {ARTIFACTS[name] for name in stage.outputs}
+    for reader in stages:
+        if reader is stage or not any(ARTIFACTS[name] in written for name in reader.inputs):
+            continue
+        record = state.get(reader.name)
+        if record and seen.get(reader.name) == record['fingerprint']:
+            record['fingerprint'] = reader.fingerprint()
+
+async def run_stages(stages=STAGES, force=(), max_parallel=MAX_PARALLEL_STAGES):
+    """
+    Run the DAG, skipping stages whose inputs are unchanged
+
+    Args:
+        stages: Stage list (any order; dependencies come from the artifacts)
+        force: stage names to rerun regardless of their inputs
+        max_parallel: stages executing at the same time
+
+    Returns:
+        dict of stage name -> run record (status, start, end, seconds)
+    """
+
+    loop = asyncio.get_running_loop()
+    dependencies = stage_dependencies(stages)
+    state = load_state()
+    timings = {}
+    tasks = {}
+    seen = {}
+    t0 = time.perf_counter()
+
+    async def run_stage(stage, pool):
+        await asyncio.gather(*(tasks[name] for name in dependencies[stage.name]))
+
+        start = time.perf_counter() - t0
+        fingerprint = stage.fingerprint()
+        seen[stage.name] = fingerprint
+        record = state.get(stage.name)
+
+        if (stage.name not in force and record and record['fingerprint'] == fingerprint
+                and stage.outputs_intact(record)):
+            timings[stage.name] = {'status': 'skipped', 'start': start, 'end': start, 'seconds': 0.0}
+            print(f"⏭️  {stage.name}: inputs unchanged, skipped")
+            return
+
+        print(f"▶️  {stage.name}: running")
+        try:
+            await loop.run_in_executor(pool, stage.run)
+        except Exception:
+            timings[stage.name] = {'status': 'failed', 'start': start, 'end': time.perf_counter() - t0}
+            print(f"❌ {stage.name}: failed")
+            raise
+
+        end = time.perf_counter() - t0
+        timings[stage.name] = {'status': 'ran', 'start': start, 'end': end, 'seconds': end - start}
+        state[stage.name] = {
+            'fingerprint': fingerprint,
+            'outputs': {name: artifact_hash(name) for name in stage.outputs},
+            'seconds': end - start,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        acknowledge_write_back(stage, stages, state, seen)
+        save_state(state)
+        print(f"✅ {stage.name}: done in {end - start:.1f}s")
+
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='refresh-stage') as pool:
+        for stage in stages:
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage, pool))
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    failed = [stage.name for stage, result in zip(stages, results) if isinstance(result, Exception)]
+    if failed:
+        first = next(result for result in results if isinstance(result, Exception))
+        raise RuntimeError(f"Refresh failed at {failed}") from first
+
+    return timings
+
+def critical_path(timings, dependencies):
+    """
+    Chain of stages that set the wall time
+
+    Walks back from the stage that finished last, each time through the
+    dependency that finished last (the one the stage was waiting on).
+    """
+
+    if not timings:
+        return []
+    current = max(timings, key=lambda name: timings[name]['end'])
+    path = [current]
+    while dependencies[current]:
+        current = max(dependencies[current], key=lambda name: timings[name]['end'])
+        path.append(current)
+    return path[::-1]
+
+def report_refresh(timings, stages=STAGES):
+    """Print per-stage status and the critical path."""
+    dependencies = stage_dependencies(stages)
+    print("\nStage      status     seconds")
+    for stage in stages:
+        t = timings[stage.name]
+        print(f"{stage.name:<10} {t['status']:<10} {t.get('seconds', 0.0):7.1f}")
+
+    if all(t['status'] == 'skipped' for t in timings.values()):
+        print("\n✅ Everything up to date")
+        return
+
+    path = critical_path(timings, dependencies)
+    wall = max(t['end'] for t in timings.values())
+    print(f"\nCritical path ({wall:.1f}s wall time): " + " -> ".join(
+        f"{name} ({timings[name].get('seconds', 0.0):.1f}s)" for name in path
+    ))
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main(force=()):
+    """Refresh the roster end to end, rerunning only stages with changed inputs."""
+    print("🔄 Roster refresh")
+    print("=" * 50)
+
+    timings = asyncio.run(run_stages(force=force))
+    report_refresh(timings)
+    return timings
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Interactive Review Sessions
+
+Drives the prompt-by-prompt manual review loops. While the reviewer is reading
+and answering one item, the display context (timelines, sample titles,
+candidate summaries, ...) for the next few items is built in a background
+thread, so moving to the next prompt doesn't wait on pandas work. Sessions can
+jump to any item and only keep contexts near the current position in memory.
+Decisions can be appended to a JSON-lines log as they are made, so they
+survive a quit and can serve as labels later.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PREFETCH = 3  # contexts built ahead of the current item
+
+# =============================================================================
+# FILTERING
+# =============================================================================
+
+def filter_review_items(df, column=None, values=None, min_confidence=None, confidence_column='confidence'):
+    """
+    Narrow a review queue by category and confidence
+
+    Args:
+        df: candidate rows
+        column: column holding the category (e.g. 'recommendation')
+        values: keep only rows whose column is in these values (None = all)
+        min_confidence: keep only rows at or above this confidence (None = all)
+    """
+
+    mask = pd.Series(True, index=df.index)
+    if column is not None and values is not None:
+        mask &= df[column].isin(list(values))
+    if min_confidence is not None:
+        mask &= df[confidence_column] >= min_confidence
+    return df[mask]
+
+# =============================================================================
+# SESSION
+# =============================================================================
+
+class ReviewSession:
+    """Cursor over review items with background prefetch of their context."""
+
+    def __init__(self, items, build_context, prefetch=PREFETCH):
+        self.items = list(items)
+        self.build_context = build_context
+        self.prefetch = prefetch
+        self.position = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='review-prefetch')
+        self._pending = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def done(self):
+        return self.position >= len(self.items)
+
+    def _schedule(self):
+        # Forget contexts we've moved past, then queue the window ahead
+        window = range(self.position, min(self.position + self.prefetch + 1, len(self.items)))
+        for pos in list(self._pending):
+            if pos not in window:
+                self._pending.pop(pos).cancel()
+        for pos in window:
+            if pos not in self._pending:
+                self._pending[pos] = self._executor.submit(self.build_context, self.items[pos])
+
+    def current(self):
+        """Return (position, item, context) for the current item."""
+        self._schedule()
+        context = self._pending[self.position].result()
+        return self.position, self.items[self.position], context
+
+    def advance(self):
+        self.position += 1
+
+    def goto(self, position):
+        """Jump to an item by 0-based position; returns False if out of range."""
+        if 0 <= position < len(self.items):
+            self.position = position
+            return True
+        return False
+
+    def close(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+# =============================================================================
+# DECISION LOG
+# =============================================================================
+
+def log_decision(path, **record):
+    """Append one review decision to a JSON-lines log."""
+    record = {'decided_at': datetime.now().isoformat(timespec='seconds'), **record}
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+def load_decisions(path, key):
+    """
+    Latest logged decision per value of `key`
+
+    Returns:
+        dict of key value -> decision record (empty if there is no log)
+    """
+
+    decisions = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    decisions[record[key]] = record
+    except FileNotFoundError:
+        pass
+    return decisions
@@ -0,0 +1,271 @@
+"""
+Roster Change Data Capture
+
+Compares a roster against an earlier snapshot and splits it into added,
+removed and modified rows, so the matching and gap-analysis stages only
+reprocess faculty whose rows actually changed.
+
+Rows are paired on (payroll_name, oa_uid). Rows left over on both sides are
+then paired on payroll_name alone, so filling in or correcting an oa_uid
+shows up as a modification rather than as a removal plus an addition.
+
+Each stage keeps its own snapshot of the roster as it last processed it,
+together with fingerprints of any other inputs (such as the papers dataset);
+when one of those changed, the stage processes every row again. Rows a stage
+left unresolved (e.g. skipped in review) are kept out of its snapshot, so
+they come back as added on the next run. Every detected change is appended
+to an audit log, one line per field.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from build_catalog import file_sha256
+from roster_schema import ROSTER_SCHEMA, apply_schema, load_roster
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+KEY_COLUMNS = ['payroll_name', 'oa_uid']
+SNAPSHOT_DIR = Path("./data/roster_snapshots")
+AUDIT_LOG_FILE = Path("./data/roster_audit_log.csv")
+
+# =============================================================================
+# DIFF
+# =============================================================================
+
+def _pair_on(old, new, columns):
+    """
+    Pair old and new rows with equal values in columns (missing values match)
+
+    Repeated keys pair up in order of appearance.
+
+    Returns:
+        DataFrame with 'old' and 'new' index labels for each pair
+    """
+
+    def keyed(df, side):
+        keys = df[columns].astype('string').fillna('\0')
+        keys['_occurrence'] = keys.groupby(columns).cumcount()
+        return keys.assign(**{side: df.index})
+
+    pairs = keyed(old, 'old').merge(keyed(new, 'new'), on=columns + ['_occurrence'])
+    return pairs[['old', 'new']]
+
+def _values_differ(before, after):
+    """Elementwise inequality where two missing values count as equal."""
+    before = before.astype('string').reset_index(drop=True)
+    after = after.astype('string').reset_index(drop=True)
+    same = (before == after).fillna(False) | (before.isna() & after.isna())
+    return ~same.to_numpy()
+
+def diff_rosters(old, new, key=KEY_COLUMNS):
+    """
+    Added, removed and modified rows between two roster snapshots
+
+    Args:
+        old: previous roster
+        new: current roster
+        key: columns identifying a faculty row
+
+    Returns:
+        dict with
+            added: rows only in new
+            removed: rows only in old
+            modified: changed rows as they are in new
+            modified_before: the same rows as they were in old
+            changes: one row per changed field (key, column, old/new value)
+    """
+
+    key = list(key)
+    pairs = _pair_on(old, new, key)
+
+    # Rows whose oa_uid changed still line up on the name
+    old_left = old.drop(index=pairs['old'])
+    new_left = new.drop(index=pairs['new'])
+    pairs = pd.concat([pairs, _pair_on(old_left, new_left, key[:1])], ignore_index=True)
+
+    before = old.loc[pairs['old']]
+    after = new.loc[pairs['new']]
+    columns = [col for col in new.columns if col in old.columns]
+
+    changed = pd.DataFrame(
+        {col: _values_differ(before[col], after[col]) for col in columns},
+        columns=columns,
+    )
+    is_modified = changed.any(axis=1).to_numpy()
+
+    # Long table of field changes, keyed by the row's current identity
+    rows, cols = changed.to_numpy().nonzero()
+    changes = pd.DataFrame({
+        **{col: after[col].to_numpy()[rows] for col in key},
+        'column': [columns[c] for c in cols],
+        'old_value': [before[columns[c]].iloc[r] for r, c in zip(rows, cols)],
+        'new_value': [after[columns[c]].iloc[r] for r, c in zip(rows, cols)],
+    })
+
+    return {
+        'added': new.drop(index=pairs['new']),
+        'removed': old.drop(index=pairs['old']),
+        'modified': after[is_modified],
+        'modified_before': before[is_modified],
+        'changes': changes,
+    }
+
+def combine_diffs(*diffs):
+    """Union of several diffs, e.g. input changes plus a stage's own edits."""
+    return {part: pd.concat([diff[part] for diff in diffs]) for part in diffs[0]}
+
+def is_empty(diff):
+    return not (len(diff['added']) or len(diff['removed']) or len(diff['modified']))
+
+def delta_mask(roster_df, diff):
+    """Rows of the current roster that were added or modified."""
+    return roster_df.index.isin(diff['added'].index.union(diff['modified'].index))
+
+def merge_delta(roster_df, processed_df):
+    """
+    Put reprocessed rows back into the full roster
+
+    processed_df must keep the roster's index labels for the rows it covers.
+    """
+    merged = pd.concat([roster_df.drop(index=processed_df.index), processed_df[roster_df.columns]])
+    return apply_schema(merged.loc[roster_df.index], ROSTER_SCHEMA)
+
+def report_diff(diff, label="roster"):
+    """Print a summary of a diff."""
+    print(f"Changes in {label}: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+          f"{len(diff['modified'])} modified ({len(diff['changes'])} field changes)")
+    if len(diff['changes']):
+        print(diff['changes']['column'].value_counts().to_string())
+
+# =============================================================================
+# SNAPSHOTS AND AUDIT LOG
+# =============================================================================
+
+def snapshot_path(stage, snapshot_dir=SNAPSHOT_DIR):
+    return Path(snapshot_dir) / f"{stage}.parquet"
+
+def _inputs_path(stage, snapshot_dir=SNAPSHOT_DIR):
+    return Path(snapshot_dir) / f"{stage}.inputs.json"
+
+def input_fingerprint(path):
+    """
+    Fingerprint of a stage input: the content hash of a file, or for a
+    dataset directory a hash of its Parquet files' paths, sizes and mtimes
+    (None if it doesn't exist)
+    """
+    path = Path(path)
+    if path.is_file():
+        return file_sha256(path)
+    if path.is_dir():
+        listing = sorted(
+            (p.relative_to(path).as_posix(), p.stat().st_size, p.stat().st_mtime_ns)
+            for p in path.rglob('*.parquet')
+        )
+        return hashlib.sha256(json.dumps(listing).encode('utf-8')).hexdigest()
+    return None
+
+def load_snapshot(stage, snapshot_dir=SNAPSHOT_DIR):
+    """Roster as the stage last processed it, or None before its first run."""
+    path = snapshot_path(stage, snapshot_dir)
+    return load_roster(path) if path.exists() else None
+
+def load_snapshot_inputs(stage, snapshot_dir=SNAPSHOT_DIR):
+    """Input fingerprints saved with the stage's snapshot (empty if none)."""
+    try:
+        with open(_inputs_path(stage, snapshot_dir), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_snapshot(roster_df, stage, snapshot_dir=SNAPSHOT_DIR, unresolved=None, inputs=None):
+    """
+    Save the roster as the stage processed it
+
+    Args:
+        unresolved: index labels of rows the stage didn't finish; they are
+            left out so the next run sees them as added
+        inputs: dict of input name -> input_fingerprint, checked by stage_delta
+    """
+
+    if unresolved is not None and len(unresolved):
+        print(f"Keeping {len(unresolved)} unresolved rows for the next {stage} run")
+        roster_df = roster_df.drop(index=unresolved)
+
+    path = snapshot_path(stage, snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    roster_df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+    inputs_path = _inputs_path(stage, snapshot_dir)
+    tmp = inputs_path.with_name(inputs_path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(inputs or {}, f, indent=2)
+    os.replace(tmp, inputs_path)
+
+def append_audit_log(diff, stage, source, path=AUDIT_LOG_FILE):
+    """
+    Append a diff to the audit log
+
+    Added and removed rows get one line each; modified rows one line per
+    changed field.
+    """
+
+    def row_events(df, change):
+        return pd.DataFrame({col: df[col].to_numpy() for col in KEY_COLUMNS}).assign(change=change)
+
+    events = pd.concat([
+        row_events(diff['added'], 'added'),
+        row_events(diff['removed'], 'removed'),
+        diff['changes'].assign(change='modified'),
+    ], ignore_index=True)
+    if len(events) == 0:
+        return 0
+
+    events.insert(0, 'source', source)
+    events.insert(0, 'stage', stage)
+    events.insert(0, 'detected_at', datetime.now().isoformat(timespec='seconds'))
+    events = events.reindex(columns=['detected_at', 'stage', 'source', 'change', *KEY_COLUMNS,
+                                     'column', 'old_value', 'new_value'])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    events.to_csv(path, mode='a', header=not path.exists(), index=False)
+    return len(events)
+
+def stage_delta(roster_df, stage, snapshot_dir=SNAPSHOT_DIR, inputs=None):
+    """
+    Diff the roster against the stage's snapshot and log the changes
+
+    Args:
+        inputs: dict of input name -> input_fingerprint for the stage's other
+            inputs; if any differs from the snapshot's, every row is processed
+
+    Returns:
+        diff dict, or None when the stage has no snapshot yet or another
+        input changed (process everything)
+    """
+
+    snapshot = load_snapshot(stage, snapshot_dir)
+    if snapshot is None:
+        print(f"No {stage} snapshot yet, processing all {len(roster_df)} rows")
+        return None
+
+    previous = load_snapshot_inputs(stage, snapshot_dir)
+    changed = sorted(name for name, fingerprint in (inputs or {}).items() if previous.get(name) != fingerprint)
+    if changed:
+        print(f"{', '.join(changed)} changed since the last {stage} run, processing all {len(roster_df)} rows")
+        return None
+
+    diff = diff_rosters(snapshot, roster_df)
+    report_diff(diff, f"roster since last {stage} run")
+    append_audit_log(diff, stage, 'input')
+    return diff
@@ -0,0 +1,148 @@
+"""
+Roster Schema and Typed Loaders
+
+Shared dtype schemas for the faculty roster (academic-research-groups.csv) and
+the department table (academic-department.csv). Both scripts load their inputs
+through these helpers so that departments and colleges are categoricals, years
+and flags are nullable small ints, and free text is Arrow-backed strings.
+"""
+
+import pandas as pd
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DATA_DIR = Path("../static/data/")
+ROSTER_FILE = DATA_DIR / "academic-research-groups.csv"
+DEPARTMENT_FILE = DATA_DIR / "academic-department.csv"
+
+NAME_DTYPE = "string[pyarrow]"
+
+ROSTER_SCHEMA = {
+    'payroll_name': NAME_DTYPE,
+    'payroll_year': 'Int16',
+    'position': 'category',
+    'oa_display_name': NAME_DTYPE,
+    'is_prof': 'Int8',
+    'perceived_as_male': 'Int8',
+    'host_dept': 'category',
+    'has_research_group': 'Int8',
+    'group_size': 'Int16',
+    'oa_uid': NAME_DTYPE,
+    'group_url': NAME_DTYPE,
+    'first_pub_year': 'Int16',
+    'inst_ipeds_id': 'Int32',
+    'notes': NAME_DTYPE,
+    'last_updated': NAME_DTYPE,
+    'college': 'category',
+}
+
+DEPARTMENT_SCHEMA = {
+    'department': 'category',
+    'college': 'category',
+    'category': 'category',
+    'inst_ipeds_id': 'Int32',
+    'year': 'Int16',
+}
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def validate_schema(df, schema, name="dataset"):
+    """
+    Check that a loaded frame has every schema column with the expected dtype
+
+    Raises:
+        ValueError: listing missing columns and dtype mismatches
+    """
+
+    problems = []
+
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        problems.append(f"missing columns {missing}")
+
+    for col, dtype in schema.items():
+        if col in df.columns and df[col].dtype != dtype:
+            problems.append(f"{col} is {df[col].dtype}, expected {dtype}")
+
+    if problems:
+        raise ValueError(f"{name} does not match schema: " + "; ".join(problems))
+
+    return df
+
+# =============================================================================
+# LOADERS
+# =============================================================================
+
+def _csv_dtypes(schema):
+    # Years were historically written as floats ("1991.0"), which the
+    # nullable int parsers reject, so read them as floats and downcast
+    return {
+        col: 'float64' if dtype.startswith('Int') else dtype
+        for col, dtype in schema.items()
+    }
+
+def _read_typed_csv(path, schema, **kwargs):
+    """Read a CSV with float-safe parsing of the nullable integer columns."""
+    return apply_schema(pd.read_csv(path, dtype=_csv_dtypes(schema), **kwargs), schema)
+
+def apply_schema(df, schema):
+    """Cast the schema columns present in df to their target dtypes."""
+    return df.astype({col: dtype for col, dtype in schema.items() if col in df.columns})
+
+def load_roster(path=ROSTER_FILE, validate=True):
+    """
+    Load the faculty roster with compact, schema-driven dtypes
+
+    Args:
+        path: CSV or Parquet file with the academic-research-groups columns
+        validate: raise if the loaded frame does not match ROSTER_SCHEMA
+
+    Returns:
+        DataFrame typed according to ROSTER_SCHEMA
+    """
+
+    path = Path(path)
+    if path.suffix == '.parquet':
+        df = apply_schema(pd.read_parquet(path), ROSTER_SCHEMA)
+    else:
+        df = _read_typed_csv(path, ROSTER_SCHEMA)
+
+    if validate:
+        validate_schema(df, ROSTER_SCHEMA, name=path.name)
+    return df
+
+def load_departments(path=DEPARTMENT_FILE, validate=True):
+    """
+    Load the department-to-college table with compact, schema-driven dtypes
+
+    Returns:
+        DataFrame typed according to DEPARTMENT_SCHEMA
+    """
+
+    path = Path(path)
+    df = _read_typed_csv(path, DEPARTMENT_SCHEMA)
+
+    if validate:
+        validate_schema(df, DEPARTMENT_SCHEMA, name=path.name)
+    return df
+
+def iter_roster_chunks(path=ROSTER_FILE, chunksize=50_000, validate=True):
+    """
+    Stream the roster CSV in typed chunks of at most chunksize rows
+
+    Categoricals are inferred per chunk, so their categories can differ
+    between chunks; convert before concatenating if that matters.
+    """
+
+    path = Path(path)
+    reader = pd.read_csv(path, dtype=_csv_dtypes(ROSTER_SCHEMA), chunksize=chunksize)
+    for chunk in reader:
+        chunk = apply_schema(chunk, ROSTER_SCHEMA)
+        if validate:
+            validate_schema(chunk, ROSTER_SCHEMA, name=path.name)
+        yield chunk
@@ -0,0 +1,98 @@
+"""
+Persistent Author Match Score Cache
+
+Stores the result of score_author_match for each (faculty name, candidate)
+pair so that reruns only rescore pairs that are new or whose inputs changed.
+Entries are keyed by normalized faculty name, candidate ID and a fingerprint
+of the candidate payload; the whole cache is tied to a scorer version hash and
+is discarded automatically when the scoring code or its inputs change.
+"""
+
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+def scorer_version(*functions, extra=None):
+    """
+    Hash the source of the scoring functions plus any extra inputs
+
+    Args:
+        functions: functions whose source code determines the score
+        extra: JSON-serializable values the score also depends on
+            (institution ID, reference year, weights, ...)
+    """
+
+    h = hashlib.sha256()
+    for func in functions:
+        h.update(inspect.getsource(func).encode('utf-8'))
+    h.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+def payload_fingerprint(author_data):
+    """Stable hash of an OpenAlex author record."""
+    blob = json.dumps(author_data, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:16]
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ScoreCache:
+    """On-disk cache of (score, flags) per faculty/candidate pair."""
+
+    def __init__(self, path, version):
+        self.path = Path(path)
+        self.version = version
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    @staticmethod
+    def make_key(normalized_name, candidate_id, fingerprint):
+        return f"{normalized_name}|{candidate_id}|{fingerprint}"
+
+    def load(self):
+        """Load entries from disk, dropping them if the scorer version changed."""
+        if not self.path.exists():
+            return self
+
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+
+        if data.get('version') == self.version:
+            self.entries = data.get('entries', {})
+            print(f"Loaded {len(self.entries)} cached scores from {self.path}")
+        else:
+            print(f"Scorer version changed, invalidating {self.path}")
+            self._dirty = True
+        return self
+
+    def get(self, key):
+        """Return cached (score, flags) or None."""
+        hit = self.entries.get(key)
+        if hit is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return hit['score'], list(hit['flags'])
+
+    def put(self, key, score, flags):
+        self.entries[key] = {'score': score, 'flags': list(flags)}
+        self._dirty = True
+
+    def save(self):
+        """Write the cache back to disk if anything changed."""
+        if not self._dirty:
+            print(f"All {self.hits} scores reused from {self.path}")
+            return
+        with open(self.path, 'w') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f)
+        self._dirty = False
+        print(f"Saved {len(self.entries)} scores to {self.path} "
+              f"({self.hits} reused, {self.misses} computed)")
@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# The scripts import each other by bare module name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class OpenAlexStub:
+    """
+    Minimal OpenAlex API for tests
+
+    /authors answers with an ETag and honours If-None-Match; /works pages
+    through `works` (author ID -> list of works with an 'updated_date') with
+    integer cursors and the from_updated_date filter. Cursors listed in
+    `fail_once` get a 400 the first time they are asked for.
+    """
+
+    def __init__(self):
+        self.authors_etag = '"v1"'
+        self.works = {}
+        self.fail_once = set()
+        self.requests = []
+        self.base_url = None
+
+    def handle(self, handler):
+        url = urlparse(handler.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.requests.append((url.path, params))
+
+        if url.path == '/authors':
+            if handler.headers.get('If-None-Match') == self.authors_etag:
+                return 304, {}, None
+            body = {'results': [{'id': 'https://openalex.org/A1', 'display_name': params.get('search')}]}
+            return 200, {'ETag': self.authors_etag}, body
+
+        if url.path == '/works':
+            cursor = params.get('cursor', '*')
+            if cursor in self.fail_once:
+                self.fail_once.discard(cursor)
+                return 400, {}, {'error': 'injected failure'}
+
+            filters = dict(part.split(':', 1) for part in params['filter'].split(','))
+            works = self.works.get(filters['author.id'], [])
+            since = filters.get('from_updated_date')
+            if since:
+                works = [w for w in works if w['updated_date'] >= since]
+
+            start = 0 if cursor == '*' else int(cursor)
+            end = start + int(params.get('per-page', 25))
+            next_cursor = str(end) if end < len(works) else None
+            return 200, {}, {'meta': {'next_cursor': next_cursor}, 'results': works[start:end]}
+
+        return 404, {}, {'error': 'not found'}
+
+
+@pytest.fixture
+def openalex_stub():
+    stub = OpenAlexStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers, body = stub.handle(self)
+            payload = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if body is not None:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+import pandas as pd
+
+from enrich_roster import enrich_roster
+from roster_schema import ROSTER_SCHEMA, load_roster
+
+
+def test_enrichment_refreshes_every_published_copy(tmp_path):
+    roster_path = tmp_path / 'roster.csv'
+    dept_path = tmp_path / 'departments.csv'
+    pd.DataFrame({
+        **{col: [None] * 3 for col in ROSTER_SCHEMA},
+        'payroll_name': ['Doe, Jane', 'Roe, Rick', 'Poe, Pat'],
+        'oa_uid': ['A1', 'A2', 'A3'],
+        'host_dept': ['Physics', 'Surgery; Medicine', 'Unknown'],
+        'college': ['CAS', 'CAS', 'CEMS'],
+    }).to_csv(roster_path, index=False)
+    pd.DataFrame({
+        'department': ['Physics', 'Surgery'],
+        'college': ['CEMS', 'LCOM'],
+        'category': ['STEM', 'Health'],
+        'inst_ipeds_id': [231174, 231174],
+        'year': [2024, 2024],
+    }).to_csv(dept_path, index=False)
+
+    stats = enrich_roster(roster_path, dept_path=dept_path, chunksize=2)
+
+    assert stats['rows'] == 3
+    assert stats['college_changed'] == 2
+    assert stats['unmapped'] == {'Unknown': 1}
+
+    csv = load_roster(roster_path)
+    assert csv['college'].astype(str).tolist() == ['CEMS', 'LCOM', 'CEMS']
+    parquet = load_roster(tmp_path / 'roster.parquet')
+    assert parquet['college'].astype(str).tolist() == ['CEMS', 'LCOM', 'CEMS']
+    with gzip.open(tmp_path / 'roster.csv.gz', 'rb') as f:
+        assert f.read() == roster_path.read_bytes()
+
+    catalog = json.loads((tmp_path / 'catalog.json').read_text())
+    assert 'roster.parquet' in json.dumps(catalog)
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,86 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+import requests
+
+import harvest_openalex_works as harvester
+from harvest_openalex_works import harvest_author, load_harvested_papers
+from openalex_http import OpenAlexSession
+
+AUTHOR = 'A1'
+
+
+def work(n, updated, cited_by_count=0):
+    return {
+        'id': f"https://openalex.org/W{n}",
+        'title': f"Paper {n}",
+        'publication_year': 2020,
+        'type': 'article',
+        'cited_by_count': cited_by_count,
+        'authorships': [{'author': {'display_name': 'Jane Doe'}}],
+        'updated_date': updated,
+    }
+
+
+@pytest.fixture
+def session(openalex_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(harvester, 'PER_PAGE', 2)
+    with OpenAlexSession(base_url=openalex_stub.base_url, cache_dir=tmp_path / 'http') as session:
+        yield session
+
+
+def works_cursors(stub):
+    return [params['cursor'] for path, params in stub.requests if path == '/works']
+
+
+def harvested(output_dir):
+    papers = load_harvested_papers(output_dir, ['work_id', 'cited_by_count'])
+    return dict(zip(papers['work_id'], papers['cited_by_count']))
+
+
+def test_interrupted_harvest_resumes_from_saved_cursor(openalex_stub, session, tmp_path):
+    openalex_stub.works[AUTHOR] = [work(n, '2024-01-01') for n in range(5)]
+    openalex_stub.fail_once.add('2')
+    output_dir = tmp_path / 'paper'
+    (output_dir / '_state').mkdir(parents=True)
+
+    with pytest.raises(requests.HTTPError):
+        harvest_author(session, AUTHOR, output_dir)
+    state = json.loads((output_dir / '_state' / f"{AUTHOR}.json").read_text())
+    assert (state['cursor'], state['pages'], state['done']) == ('2', 1, False)
+
+    state = harvest_author(session, AUTHOR, output_dir)
+    assert state['done'] and state['works'] == 5
+    # The first page is not asked for again
+    assert works_cursors(openalex_stub) == ['*', '2', '2', '4']
+    assert sorted(harvested(output_dir)) == [f"W{n}" for n in range(5)]
+
+
+def test_refresh_pages_only_works_updated_since_last_harvest(openalex_stub, session, tmp_path):
+    openalex_stub.works[AUTHOR] = [work(n, '2024-01-01') for n in range(3)]
+    output_dir = tmp_path / 'paper'
+    (output_dir / '_state').mkdir(parents=True)
+    harvest_author(session, AUTHOR, output_dir)
+
+    # Harvested two days ago; since then one work changed and one was added
+    state_path = output_dir / '_state' / f"{AUTHOR}.json"
+    state = json.loads(state_path.read_text())
+    last = (date.today() - timedelta(days=2)).isoformat()
+    state_path.write_text(json.dumps({**state, 'started': last, 'harvested_at': last}))
+    today = date.today().isoformat()
+    openalex_stub.works[AUTHOR][1] = work(1, today, cited_by_count=7)
+    openalex_stub.works[AUTHOR].append(work(3, today))
+    openalex_stub.requests.clear()
+
+    state = harvest_author(session, AUTHOR, output_dir, refresh_after_days=1)
+
+    filters = [params['filter'] for path, params in openalex_stub.requests if path == '/works']
+    assert filters == [f"author.id:{AUTHOR},from_updated_date:{last}"]
+    assert state['done'] and state['pass'] == 1 and state['works'] == 4
+    assert harvested(output_dir) == {'W0': 0, 'W1': 7, 'W2': 0, 'W3': 0}
+
+    # Within the refresh interval nothing is requested
+    openalex_stub.requests.clear()
+    harvest_author(session, AUTHOR, output_dir, refresh_after_days=1)
+    assert openalex_stub.requests == []
@@ -0,0 +1,23 @@
+from openalex_http import OpenAlexSession
+
+
+def test_cached_responses_are_revalidated_with_etags(openalex_stub, tmp_path):
+    with OpenAlexSession(base_url=openalex_stub.base_url, cache_dir=tmp_path) as session:
+        first = session.search_authors('Jane Doe')
+        again = session.search_authors('Jane Doe')
+        assert again == first
+        assert session.stats == {'fetched': 1, 'not_modified': 1}
+
+        # A changed resource is fetched in full and replaces the cached copy
+        openalex_stub.authors_etag = '"v2"'
+        session.search_authors('Jane Doe')
+        session.search_authors('Jane Doe')
+        assert session.stats == {'fetched': 2, 'not_modified': 2}
+
+
+def test_uncached_requests_are_not_conditional(openalex_stub, tmp_path):
+    with OpenAlexSession(base_url=openalex_stub.base_url, cache_dir=tmp_path) as session:
+        session.search_authors('Jane Doe', revalidate=False)
+        session.search_authors('Jane Doe', revalidate=False)
+        assert session.stats == {'fetched': 2}
+    assert not list(tmp_path.iterdir())
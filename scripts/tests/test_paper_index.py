@@ -0,0 +1,30 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from paper_index import PaperIndex, PartitionedPapers
+
+SCHEMA = pa.schema([('ego_aid', pa.string()), ('work_id', pa.string()), ('pub_year', pa.int16())])
+
+
+def test_rewritten_partitions_keep_the_spill_schema(tmp_path):
+    # A1's undated paper makes its partition's pub_year nullable
+    papers = pa.table({
+        'ego_aid': ['A1', 'A1', 'A2', 'A3', 'A4'],
+        'work_id': ['w1', 'w2', 'w3', 'w4', 'w5'],
+        'pub_year': pa.array([2000, None, 2010, 2011, 1990], pa.int16()),
+    }, schema=SCHEMA)
+    pq.write_table(papers, tmp_path / 'papers.parquet')
+
+    parts = PartitionedPapers.spill(tmp_path / 'papers.parquet', tmp_path / 'parts', 3)
+    for i in range(parts.n_partitions):
+        kept = PaperIndex(parts.read_partition(i)).filter_since({'A4': 2000})
+        parts.write_partition(i, kept.papers)
+
+    for i in range(parts.n_partitions):
+        assert pq.read_schema(parts.partition_path(i)).field('pub_year').type == pa.int16()
+
+    PartitionedPapers(tmp_path / 'parts', 3).to_parquet(tmp_path / 'all.parquet')
+    exported = pd.read_parquet(tmp_path / 'all.parquet')
+    assert sorted(exported['work_id']) == ['w1', 'w2', 'w3', 'w4']
+    assert pq.read_schema(tmp_path / 'all.parquet').equals(SCHEMA)
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from publish_datasets import publish_dataset
+from roster_diff import diff_rosters
+from roster_schema import ROSTER_SCHEMA, apply_schema
+
+
+def make_roster(rows):
+    df = pd.DataFrame(rows, columns=['payroll_name', 'oa_uid', 'payroll_year', 'college'])
+    return apply_schema(df, ROSTER_SCHEMA)
+
+
+def test_delta_that_empties_a_partition_removes_it(tmp_path):
+    old = make_roster([
+        ('Doe, Jane', 'A1', 2024, 'CEMS'),
+        ('Roe, Rick', 'A2', 2024, 'CEMS'),
+        ('Poe, Pat', 'A3', 2024, 'CAS'),
+    ])
+    publish_dataset(old, 'roster', tmp_path, partition_by=('college',))
+    by_college = tmp_path / 'roster' / 'by-college'
+    assert sorted(p.name for p in by_college.iterdir()) == ['college=CAS', 'college=CEMS']
+
+    new = old[old['college'] != 'CAS']
+    publish_dataset(new, 'roster', tmp_path, partition_by=('college',),
+                    delta=diff_rosters(old, new))
+
+    assert [p.name for p in by_college.iterdir()] == ['college=CEMS']
+    assert not (tmp_path / 'roster' / 'by-college.tmp').exists()
+    published = pd.read_parquet(by_college)
+    assert sorted(published['payroll_name']) == ['Doe, Jane', 'Roe, Rick']
+
+
+def test_delta_rewrites_only_touched_partitions(tmp_path):
+    old = make_roster([
+        ('Doe, Jane', 'A1', 2024, 'CEMS'),
+        ('Poe, Pat', 'A3', 2024, 'CAS'),
+    ])
+    publish_dataset(old, 'roster', tmp_path, partition_by=('college',))
+
+    new = old.copy()
+    new.loc[new['oa_uid'] == 'A3', 'payroll_year'] = 2025
+    sizes = publish_dataset(new, 'roster', tmp_path, partition_by=('college',),
+                            delta=diff_rosters(old, new))
+
+    rewritten = [path for path in sizes if 'by-college' in path]
+    assert len(rewritten) == 1 and 'college=CAS' in rewritten[0]
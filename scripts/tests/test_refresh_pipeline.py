@@ -0,0 +1,22 @@
+import time
+
+import harvest_openalex_works as harvester
+from refresh_pipeline import harvest_window
+
+
+def test_harvest_window_without_refresh_is_constant(monkeypatch):
+    monkeypatch.setattr(harvester, 'REFRESH_AFTER_DAYS', None)
+    assert harvest_window() == harvest_window()
+
+
+def test_harvest_window_changes_every_run_for_non_positive_intervals(monkeypatch):
+    for days in (0, -1):
+        monkeypatch.setattr(harvester, 'REFRESH_AFTER_DAYS', days)
+        first = harvest_window()
+        time.sleep(0.001)
+        assert harvest_window() != first
+
+
+def test_harvest_window_counts_refresh_intervals(monkeypatch):
+    monkeypatch.setattr(harvester, 'REFRESH_AFTER_DAYS', 7)
+    assert isinstance(harvest_window(), int)
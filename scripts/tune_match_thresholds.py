@@ -0,0 +1,269 @@
+"""
+Match Threshold Tuning
+
+Grid-searches the scoring weights and confidence cutoffs used by
+augment_faculty_openalex.py against past manual review decisions.
+
+Name similarity, affiliation recency and works count are computed once per
+cached candidate; every weight setting then rescores all candidates with a
+few numpy operations, and every cutoff/margin combination is evaluated by
+broadcasting over the search keys, so the whole grid runs in seconds without
+touching the API.
+
+Labels come from the review log written during interactive review (the
+chosen ID, or no match). The log is local state and is kept out of git, like
+the score cache and the grid results. The roster's oa_uid can fill in names that were
+never reviewed, but most of those IDs were assigned by this matcher at its
+current cutoffs, so scoring against them partly grades the scorer on its own
+output; that is off by default. For each setting it reports:
+
+- precision: auto-accepted best matches that agree with the label
+- recall: labelled matches found without a review
+- review load: names that would be sent to manual review
+"""
+
+import itertools
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import augment_faculty_openalex as matcher
+from review_session import load_decisions
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+NAME_WEIGHTS = range(40, 81, 5)
+CURRENT_AFFILIATION_POINTS = range(15, 46, 5)
+NO_PUBLICATIONS_PENALTIES = (-20, -15, -10, -5, 0)
+HIGH_CUTOFFS = range(55, 91, 5)
+MEDIUM_CUTOFFS = range(30, 71, 5)
+COMPETITOR_MARGINS = np.arange(0, 20.1, 2.5)
+
+MIN_PRECISION = 0.95
+USE_ROSTER_LABELS = False  # also label unreviewed names with the roster's oa_uid
+TOP_N = 10
+RESULTS_FILE = Path("./match_threshold_grid.csv")
+
+# =============================================================================
+# CANDIDATES AND LABELS
+# =============================================================================
+
+def short_id(openalex_id):
+    if openalex_id is None or pd.isna(openalex_id):
+        return None
+    return str(openalex_id).replace('https://openalex.org/', '')
+
+def load_cached_candidates(cache_file=matcher.CACHE_FILE):
+    """Search results cached by augment_faculty_openalex.py, keyed by search_key."""
+    with open(cache_file, 'r') as f:
+        cached = json.load(f)
+    return {matcher.canonical_name_key(name): authors for name, authors in cached.items()}
+
+def build_candidate_table(search_groups, raw_search_results):
+    """
+    Score features for every cached candidate, one row per (name, candidate)
+
+    Rows keep the search result order within each name, which is how the
+    matcher breaks ties between equal scores.
+    """
+
+    rows = []
+    for search_key, faculty_name in search_groups.items():
+        for position, author in enumerate(raw_search_results.get(search_key) or []):
+            name_sim, years_since_uvm, works_count = matcher.match_features(faculty_name, author)
+            tier = matcher.affiliation_tier(years_since_uvm)
+            rows.append({
+                'search_key': search_key,
+                'position': position,
+                'candidate_id': short_id(author.get('id')),
+                'name_sim': name_sim,
+                'tier': -1 if tier is None else tier,
+                'no_works': works_count == 0,
+            })
+
+    candidates = pd.DataFrame(rows, columns=['search_key', 'position', 'candidate_id',
+                                             'name_sim', 'tier', 'no_works'])
+    candidates['group'] = pd.factorize(candidates['search_key'])[0]
+    return candidates
+
+def load_labels(faculty_df=None, review_log=matcher.REVIEW_LOG_FILE):
+    """
+    Correct OpenAlex ID per search_key (None = reviewer said no match)
+
+    Logged review decisions win over the roster's oa_uid.
+    """
+
+    labels = {}
+    if faculty_df is not None:
+        curated = faculty_df.dropna(subset=['oa_uid']).drop_duplicates('search_key')
+        labels.update({key: short_id(aid) for key, aid in zip(curated['search_key'], curated['oa_uid'])})
+
+    for key, record in load_decisions(review_log, 'search_key').items():
+        labels[key] = short_id(record['chosen'])
+    return labels
+
+# =============================================================================
+# VECTORIZED REPLAY
+# =============================================================================
+
+def replay_scores(candidates, name_weight, current_points, no_publications_penalty):
+    """
+    Best and runner-up score per name for one weight setting
+
+    Adds the terms in the same order as compute_author_score, so at the
+    configured weights the scores are identical to the matcher's.
+
+    Returns:
+        (best score, runner-up score or -inf, best candidate ID), one entry per group
+    """
+
+    points = np.array([current_points, *matcher.AFFILIATION_POINTS[1:], 0], dtype=np.float64)
+    score = candidates['name_sim'].to_numpy() * name_weight
+    score = score + points[candidates['tier'].to_numpy()]
+    score = score + no_publications_penalty * candidates['no_works'].to_numpy()
+
+    group = candidates['group'].to_numpy()
+    order = np.lexsort((candidates['position'].to_numpy(), -score, group))
+    group, score = group[order], score[order]
+
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    has_runner_up = np.r_[starts[1:], len(group)] - starts > 1
+
+    best = score[starts]
+    runner_up = np.where(has_runner_up, score[np.minimum(starts + 1, len(score) - 1)], -np.inf)
+    best_id = candidates['candidate_id'].to_numpy()[order][starts]
+    return best, runner_up, best_id
+
+def evaluate_cutoffs(best, runner_up, correct, labelled, positives):
+    """
+    Metrics for every (high, medium, margin) combination at once
+
+    Mirrors process_matches/main: a name needs review when its best score is
+    'low' or the runner-up is within the margin; everything else is accepted.
+    """
+
+    high = np.asarray(HIGH_CUTOFFS, dtype=np.float64)[:, None, None, None]
+    medium = np.asarray(MEDIUM_CUTOFFS, dtype=np.float64)[None, :, None, None]
+    margin = np.asarray(COMPETITOR_MARGINS, dtype=np.float64)[None, None, :, None]
+
+    needs_review = (best <= medium) | (best - runner_up < margin)
+    accepted = ~needs_review
+    is_high = best > high
+
+    accepted_labelled = (accepted & labelled).sum(-1)
+    accepted_correct = (accepted & correct).sum(-1)
+    high_labelled = (is_high & labelled).sum(-1)
+    high_correct = (is_high & correct).sum(-1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics = {
+            'precision': accepted_correct / accepted_labelled,
+            'recall': accepted_correct / positives if positives else np.full(accepted_correct.shape, np.nan),
+            'review_load': needs_review.sum(-1),
+            'high_precision': high_correct / high_labelled,
+        }
+
+    shape = (len(HIGH_CUTOFFS), len(MEDIUM_CUTOFFS), len(COMPETITOR_MARGINS))
+    grid = np.stack(np.meshgrid(HIGH_CUTOFFS, MEDIUM_CUTOFFS, COMPETITOR_MARGINS, indexing='ij'), -1)
+    frame = pd.DataFrame(grid.reshape(-1, 3), columns=['high', 'medium', 'margin'])
+    for name, values in metrics.items():
+        frame[name] = np.broadcast_to(values, shape).reshape(-1)
+    return frame[frame['medium'] < frame['high']]
+
+def grid_search(candidates, labels):
+    """Evaluate every weight and cutoff combination; returns one row per setting."""
+    group_keys = candidates.drop_duplicates('group').sort_values('group')['search_key']
+    labelled = group_keys.isin(list(labels)).to_numpy()
+    label_ids = np.array([labels.get(key) for key in group_keys], dtype=object)
+    positives = int(sum(aid is not None for aid in label_ids[labelled]))
+
+    results = []
+    for name_weight, current_points, penalty in itertools.product(
+            NAME_WEIGHTS, CURRENT_AFFILIATION_POINTS, NO_PUBLICATIONS_PENALTIES):
+        best, runner_up, best_id = replay_scores(candidates, name_weight, current_points, penalty)
+        correct = labelled & (best_id == label_ids)
+
+        frame = evaluate_cutoffs(best, runner_up, correct, labelled, positives)
+        frame.insert(0, 'no_publications_penalty', penalty)
+        frame.insert(0, 'current_affiliation_points', current_points)
+        frame.insert(0, 'name_weight', name_weight)
+        results.append(frame)
+
+    return pd.concat(results, ignore_index=True)
+
+def rank_settings(grid, min_precision=MIN_PRECISION):
+    """Settings meeting the precision floor, lightest review load first."""
+    ok = grid[(grid['precision'] >= min_precision) & (grid['high_precision'].fillna(1) >= min_precision)]
+    return ok.sort_values(['review_load', 'recall', 'high'], ascending=[True, False, True])
+
+def current_setting(grid):
+    """Row of the grid matching the matcher's configured constants."""
+    return grid[
+        (grid['name_weight'] == matcher.NAME_WEIGHT)
+        & (grid['current_affiliation_points'] == matcher.AFFILIATION_POINTS[0])
+        & (grid['no_publications_penalty'] == matcher.NO_PUBLICATIONS_PENALTY)
+        & (grid['high'] == matcher.HIGH_CONFIDENCE)
+        & (grid['medium'] == matcher.MEDIUM_CONFIDENCE)
+        & (grid['margin'] == matcher.COMPETITOR_MARGIN)
+    ]
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main():
+    """Tune the matcher's weights and cutoffs against logged review decisions."""
+    print("🎯 Match threshold tuning")
+    print("=" * 50)
+
+    faculty_df = matcher.load_and_prepare_faculty_data()
+    search_groups = matcher.dedupe_search_names(faculty_df)
+    raw_search_results = load_cached_candidates()
+
+    start = time.perf_counter()
+    candidates = build_candidate_table(search_groups, raw_search_results)
+    labels = load_labels(faculty_df if USE_ROSTER_LABELS else None)
+    labels = {key: aid for key, aid in labels.items() if key in set(candidates['search_key'])}
+    print(f"{candidates['group'].nunique()} names with {len(candidates)} cached candidates, "
+          f"{len(labels)} labelled")
+    if not labels:
+        print("⚠️  No labels yet: review some matches first")
+        return None
+
+    grid = grid_search(candidates, labels)
+    print(f"Evaluated {len(grid):,} settings in {time.perf_counter() - start:.1f}s")
+    grid.to_csv(RESULTS_FILE, index=False)
+
+    columns = ['name_weight', 'current_affiliation_points', 'no_publications_penalty',
+               'high', 'medium', 'margin', 'precision', 'recall', 'review_load', 'high_precision']
+    print("\nCurrent setting:")
+    print(current_setting(grid)[columns].to_string(index=False))
+
+    ranked = rank_settings(grid)
+    if len(ranked) == 0:
+        print(f"\n⚠️  No setting reaches {MIN_PRECISION:.0%} precision")
+        return grid
+
+    print(f"\nTop {TOP_N} settings with precision >= {MIN_PRECISION:.0%}:")
+    print(ranked[columns].head(TOP_N).to_string(index=False))
+
+    best = ranked.iloc[0]
+    print("\nSuggested constants for augment_faculty_openalex.py:")
+    print(f"   NAME_WEIGHT = {best['name_weight']:g}")
+    print(f"   AFFILIATION_POINTS = ({best['current_affiliation_points']:g}, "
+          f"{matcher.AFFILIATION_POINTS[1]}, {matcher.AFFILIATION_POINTS[2]})")
+    print(f"   NO_PUBLICATIONS_PENALTY = {best['no_publications_penalty']:g}")
+    print(f"   HIGH_CONFIDENCE = {best['high']:g}")
+    print(f"   MEDIUM_CONFIDENCE = {best['medium']:g}")
+    print(f"   COMPETITOR_MARGIN = {best['margin']:g}")
+    print(f"\nFull grid saved to {RESULTS_FILE}")
+
+    return grid
+
+if __name__ == "__main__":
+    main()